@@ -0,0 +1,226 @@
+"""gzip/brotli response compression.
+
+CompressionMiddleware compresses text responses for clients that accept it,
+preferring brotli. Bodies of responses that carry an ETag (validated pages,
+static files) are the same bytes every time for that ETag, so their
+compressed form is kept in an LRU of at most COMPRESS_CACHE_BYTES and reused
+instead of recompressed. Bodies over COMPRESS_MAX_BYTES (by Content-Length,
+or once that much has been buffered) are compressed chunk by chunk as they
+are sent, and never cached, so large static files are not held in memory.
+Without the brotli package installed only gzip is offered.
+"""
+import gzip
+import os
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+COMPRESSION = os.environ.get("COMPRESSION", "1") != "0"
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "500"))
+COMPRESS_MAX_BYTES = int(os.environ.get("COMPRESS_MAX_BYTES", str(1024 * 1024)))
+COMPRESS_CACHE_BYTES = int(os.environ.get("COMPRESS_CACHE_BYTES", str(16 * 1024 * 1024)))
+
+# Per-response levels: fast enough to run on every uncached page. The static
+# exporter compresses once, at the maximum levels.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_cache_bytes = 0
+_stats = {"hits": 0, "misses": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def encodings() -> list[str]:
+    """Supported encodings, most preferred first."""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+def compressor(encoding: str):
+    """(feed, finish) for compressing a body chunk by chunk."""
+    if encoding == "br":
+        c = brotli.Compressor(quality=BROTLI_QUALITY)
+        return c.process, c.finish
+    c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return c.compress, c.flush
+
+
+def _negotiate(accept_encoding: str) -> str | None:
+    offered = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params.strip() and float(q) <= 0:
+                continue
+        except ValueError:
+            pass
+        offered.add(name.strip().lower())
+    for encoding in encodings():
+        if encoding in offered or "*" in offered:
+            return encoding
+    return None
+
+
+def compression_stats() -> dict:
+    return {**_stats, "size": len(_cache), "bytes": _cache_bytes}
+
+
+def clear_compression_cache() -> None:
+    global _cache_bytes
+    _cache.clear()
+    _cache_bytes = 0
+    for key in _stats:
+        _stats[key] = 0
+
+
+def _weak_etag(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    # Compressed bytes differ from the identity ones, so the validator is only
+    # weakly equivalent (nginx does the same).
+    return [
+        (k, b"W/" + v if k.lower() == b"etag" and not v.startswith(b"W/") else v)
+        for k, v in headers
+    ]
+
+
+def _cache_put(key: tuple, compressed: bytes) -> None:
+    global _cache_bytes
+    if len(compressed) > COMPRESS_CACHE_BYTES:
+        return
+    _cache[key] = compressed
+    _cache_bytes += len(compressed)
+    while _cache_bytes > COMPRESS_CACHE_BYTES:
+        _, dropped = _cache.popitem(last=False)
+        _cache_bytes -= len(dropped)
+
+
+def _encoded_headers(start: dict, encoding: str) -> list[tuple[bytes, bytes]]:
+    """Response headers for a compressed body, minus its Content-Length."""
+    headers = [(k, v) for k, v in start.get("headers", []) if k.lower() not in (b"content-length", b"vary")]
+    return _weak_etag(headers) + [(b"content-encoding", encoding.encode()), (b"vary", _vary(start))]
+
+
+def _vary(start: dict) -> bytes:
+    vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+    return b", ".join(vary + [b"Accept-Encoding"]) if vary else b"Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """ASGI middleware: compress text responses, caching ETagged ones and
+    streaming large ones."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not COMPRESSION:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+        encoding = _negotiate(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks: list[bytes] = []
+        buffered = 0
+        passthrough = False
+        stream = None  # (feed, finish) once the body is being streamed
+
+        async def send_compressed(message):
+            nonlocal start, passthrough, buffered, stream
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    # Revalidating a body we compressed: echo the weak ETag it went out with.
+                    message = {**message, "headers": _weak_etag(message.get("headers", []))}
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    message["status"] != 200
+                    or b"content-encoding" in headers
+                    or not content_type.startswith(_COMPRESSIBLE)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                if int(headers.get(b"content-length", b"0")) > COMPRESS_MAX_BYTES:
+                    stream = await self._start_stream(send, start, encoding)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                chunks.append(body)
+                buffered += len(body)
+                if not more_body:
+                    await self._send_body(send, start, b"".join(chunks), encoding, scope["path"])
+                    return
+                if buffered <= COMPRESS_MAX_BYTES:
+                    return
+                stream = await self._start_stream(send, start, encoding)
+                body = b"".join(chunks)
+                chunks.clear()
+            feed, finish = stream
+            out = feed(body)
+            if not more_body:
+                out += finish()
+            _stats["bytes_in"] += len(body)
+            _stats["bytes_out"] += len(out)
+            if out or not more_body:
+                await send({"type": "http.response.body", "body": out, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _start_stream(self, send, start, encoding: str):
+        _stats["streamed"] += 1
+        await send({**start, "headers": _encoded_headers(start, encoding)})
+        return compressor(encoding)
+
+    async def _send_body(self, send, start, body: bytes, encoding: str, path: str):
+        if len(body) < COMPRESS_MIN_BYTES:
+            headers = [(k, v) for k, v in start.get("headers", []) if k.lower() not in (b"content-length", b"vary")]
+            await send({**start, "headers": headers + [
+                (b"content-length", str(len(body)).encode()), (b"vary", _vary(start)),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = next((v for k, v in start.get("headers", []) if k.lower() == b"etag"), None)
+        key = (path, etag, encoding) if etag else None
+        compressed = _cache.get(key) if key else None
+        if compressed is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+        else:
+            compressed = compress(body, encoding)
+            _stats["misses"] += 1
+            if key:
+                _cache_put(key, compressed)
+        _stats["bytes_in"] += len(body)
+        _stats["bytes_out"] += len(compressed)
+
+        await send({**start, "headers": _encoded_headers(start, encoding) + [
+            (b"content-length", str(len(compressed)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": compressed})
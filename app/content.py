@@ -1,80 +1,326 @@
 """Course content loader — reads markdown and YAML from the course directory."""
 import os
-import re
+import json
+import time
+import hashlib
+import tempfile
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
 import mistune
 import yaml
 
+from app import highlight
+
 COURSE_DIR = Path(os.environ.get("COURSE_DIR", "/course"))
 
+# Bump whenever render_markdown's output changes for the same input, so cached
+# HTML produced by an older renderer is never served.
+RENDERER_VERSION = "3"
+
+
+# Callout markers, in priority order: a blockquote whose own paragraphs contain
+# one of these as bold text gets the matching callout class.
+_CALLOUT_MARKERS = [
+    ("note", ("Note:", "📝")),
+    ("warning", ("Warning:", "⚠️")),
+    ("exercise", ("Exercise:", "🏋️")),
+    ("tip", ("Tip:", "💡")),
+]
+
+
+def _callout_kind(token: dict) -> str | None:
+    """Classify a block_quote token by the bold markers in its direct paragraphs.
+
+    Nested blockquotes are classified on their own, so a tip inside a note no
+    longer changes the outer callout.
+    """
+    found = set()
+    for child in token.get("children", []):
+        if child["type"] != "paragraph":
+            continue
+        for inline in child.get("children", []):
+            if inline["type"] == "strong":
+                found.add("".join(t.get("raw", "") for t in inline.get("children", [])))
+    for kind, markers in _CALLOUT_MARKERS:
+        if any(marker in found for marker in markers):
+            return kind
+    return None
+
+
+class _AcademyRenderer(mistune.HTMLRenderer):
+    """HTML renderer with mermaid fences, server-side highlighting and callouts."""
+
+    def block_code(self, code: str, info: str | None = None) -> str:
+        lang = info.split(None, 1)[0] if info and info.strip() else ""
+        if lang == "mermaid":
+            return f'<div class="mermaid">\n{code.strip()}\n</div>\n'
+        if not highlight.SERVER_HIGHLIGHT:
+            return super().block_code(code, info)
+        inner = highlight.highlight(code, lang) if lang else None
+        if inner is None:
+            inner = mistune.escape(code, quote=False)
+        css = f"hljs language-{mistune.safe_entity(lang)}" if lang else "hljs"
+        return f'<pre><code class="{css}">{inner}</code></pre>\n'
 
-def _make_renderer():
-    """Custom mistune renderer with mermaid support."""
-    # We'll post-process mermaid blocks ourselves
-    renderer = mistune.HTMLRenderer(escape=False)
-    return renderer
+    def render_token(self, token: dict, state) -> str:
+        if token["type"] == "block_quote":
+            kind = _callout_kind(token)
+            css = f"callout callout-{kind}" if kind else "callout"
+            text = self.render_tokens(token["children"], state)
+            return f'<blockquote class="{css}">\n{text}</blockquote>\n'
+        return super().render_token(token, state)
+
+
+# One parser for the whole process; mistune keeps per-call state in BlockState,
+# so the instance is safe to reuse.
+_markdown = mistune.create_markdown(
+    renderer=_AcademyRenderer(escape=False),
+    plugins=["table", "strikethrough", "task_lists"],
+)
 
 
 def render_markdown(text: str) -> str:
     """Render markdown to HTML, with mermaid and callout support."""
-    # Pre-process: convert ```mermaid blocks to <div class="mermaid">
-    def mermaid_replace(match):
-        code = match.group(1).strip()
-        return f'<div class="mermaid">\n{code}\n</div>'
-
-    text = re.sub(r'```mermaid\n(.*?)```', mermaid_replace, text, flags=re.DOTALL)
-
-    # Render markdown
-    md = mistune.create_markdown(renderer=mistune.HTMLRenderer(escape=False), plugins=['table', 'strikethrough', 'task_lists'])
-    html = md(text)
-
-    # Post-process blockquotes for callout types
-    def callout_replace(match):
-        content = match.group(1)
-        if '<strong>Note:</strong>' in content or '<strong>📝</strong>' in content:
-            return f'<blockquote class="callout callout-note">{content}</blockquote>'
-        elif '<strong>Warning:</strong>' in content or '<strong>⚠️</strong>' in content:
-            return f'<blockquote class="callout callout-warning">{content}</blockquote>'
-        elif '<strong>Exercise:</strong>' in content or '<strong>🏋️</strong>' in content:
-            return f'<blockquote class="callout callout-exercise">{content}</blockquote>'
-        elif '<strong>Tip:</strong>' in content or '<strong>💡</strong>' in content:
-            return f'<blockquote class="callout callout-tip">{content}</blockquote>'
-        return f'<blockquote class="callout">{content}</blockquote>'
-
-    html = re.sub(r'<blockquote>(.*?)</blockquote>', callout_replace, html, flags=re.DOTALL)
+    return _markdown(text)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Rendered lesson cache
+#
+# Bounded LRU of rendered HTML keyed by (renderer version, sha256 of the
+# markdown source), so warm lesson views skip markdown rendering entirely and
+# an edited lesson naturally misses.
+#
+# With RENDER_CACHE_DIR set, renders are also written to a content-addressed
+# directory (one file per key, atomic rename) so every worker and every
+# restart can reuse them. prune_render_cache_dir() removes orphans and keeps
+# the directory under RENDER_CACHE_DIR_MAX_MB.
+# ─────────────────────────────────────────────────────────────────────────────
+
+RENDER_CACHE_SIZE = int(os.environ.get("RENDER_CACHE_SIZE", "256"))
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR", "")
+RENDER_CACHE_DIR_MAX_BYTES = int(os.environ.get("RENDER_CACHE_DIR_MAX_MB", "64")) * 1024 * 1024
+
+_render_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+_render_stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_writes": 0}
+
+
+def _render_key(text: str) -> tuple[str, str]:
+    # Highlighted and plain renders of the same source must not share entries.
+    version = RENDERER_VERSION + ("h" if highlight.SERVER_HIGHLIGHT else "")
+    return (version, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+
+def _disk_path(key: tuple[str, str]) -> Path | None:
+    if not RENDER_CACHE_DIR:
+        return None
+    version, digest = key
+    return Path(RENDER_CACHE_DIR) / f"v{version}-{digest}.html"
 
+
+def _disk_get(key: tuple[str, str]) -> str | None:
+    path = _disk_path(key)
+    if path is None:
+        return None
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _disk_put(key: tuple[str, str], html: str) -> None:
+    """Write-then-rename so readers in other workers never see a partial file."""
+    path = _disk_path(key)
+    if path is None:
+        return
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".html")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp, path)
+        _render_stats["disk_writes"] += 1
+    except OSError:
+        # A read-only or full disk only costs us the persistent copy.
+        if tmp:
+            Path(tmp).unlink(missing_ok=True)
+
+
+def _memory_put(key: tuple[str, str], html: str) -> None:
+    if RENDER_CACHE_SIZE <= 0:
+        return
+    _render_cache[key] = html
+    while len(_render_cache) > RENDER_CACHE_SIZE:
+        _render_cache.popitem(last=False)
+        _render_stats["evictions"] += 1
+
+
+def render_markdown_cached(text: str) -> str:
+    """render_markdown() through the LRU cache (and the disk cache, if enabled)."""
+    key = _render_key(text)
+    html = _render_cache.get(key)
+    if html is not None:
+        _render_cache.move_to_end(key)
+        _render_stats["hits"] += 1
+        return html
+
+    html = _disk_get(key)
+    if html is not None:
+        _render_stats["disk_hits"] += 1
+    else:
+        _render_stats["misses"] += 1
+        html = render_markdown(text)
+        _disk_put(key, html)
+    _memory_put(key, html)
     return html
 
 
-def load_modules() -> list[dict]:
-    """Load all modules sorted by order."""
-    modules = []
-    if not COURSE_DIR.exists():
-        return modules
+def render_cache_stats() -> dict:
+    """Hit/miss/eviction counters plus current size of the render cache."""
+    return {**_render_stats, "size": len(_render_cache), "max_size": RENDER_CACHE_SIZE}
 
-    for module_dir in sorted(COURSE_DIR.iterdir()):
-        if not module_dir.is_dir():
-            continue
+
+def clear_render_cache() -> None:
+    """Drop all cached renders and reset the counters."""
+    _render_cache.clear()
+    for k in _render_stats:
+        _render_stats[k] = 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Course catalog
+#
+# meta.yaml files are parsed once and kept in memory. On each lookup we only
+# stat the course tree; a module is re-parsed when its meta.yaml mtime/size
+# changes, and the directory listing is re-read when COURSE_DIR itself changes
+# (module added/removed). Set CONTENT_RELOAD=0 to skip the stat checks entirely
+# and rely on reload_catalog() (or SIGHUP) instead. catalog_version() changes
+# whenever the module list or any module's metadata does.
+# ─────────────────────────────────────────────────────────────────────────────
+
+CONTENT_RELOAD = os.environ.get("CONTENT_RELOAD", "1") != "0"
+
+_catalog_root: Path | None = None
+_catalog_root_key: tuple[int, int] | None = None
+_catalog_dirs: list[Path] = []
+_catalog_meta: dict[Path, tuple[tuple[int, int], dict]] = {}
+_catalog_modules: list[dict] = []
+_catalog_by_id: dict[str, dict] = {}
+_catalog_version = 0
+_catalog_modified = time.time()
+
+
+def _catalog_changed() -> None:
+    global _catalog_version, _catalog_modified
+    _catalog_version += 1
+    _catalog_modified = time.time()
+
+
+def catalog_version() -> int:
+    """Counter bumped every time the catalog (or bundle) in use changes."""
+    if _bundle is None:
+        _refresh_catalog()
+    return _catalog_version
+
+
+def catalog_modified() -> float:
+    """Wall-clock time of the last catalog change (or of process start)."""
+    return _catalog_modified
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    """Cheap change signature for a file or directory: (mtime_ns, size)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _refresh_catalog(force: bool = False) -> None:
+    """Bring the in-memory catalog up to date with COURSE_DIR."""
+    global _catalog_root, _catalog_root_key, _catalog_dirs, _catalog_modules, _catalog_by_id
+
+    if not force and not CONTENT_RELOAD and _catalog_root == COURSE_DIR:
+        return
+
+    root_key = _stat_key(COURSE_DIR)
+    if root_key is None:
+        if _catalog_modules or _catalog_root != COURSE_DIR:
+            _catalog_changed()
+        _catalog_root, _catalog_root_key = COURSE_DIR, None
+        _catalog_dirs, _catalog_modules, _catalog_by_id = [], [], {}
+        _catalog_meta.clear()
+        return
+
+    changed = force or _catalog_root != COURSE_DIR or root_key != _catalog_root_key
+    if changed:
+        _catalog_dirs = [d for d in sorted(COURSE_DIR.iterdir()) if d.is_dir()]
+        for stale in set(_catalog_meta) - set(_catalog_dirs):
+            del _catalog_meta[stale]
+        _catalog_root, _catalog_root_key = COURSE_DIR, root_key
+
+    for module_dir in _catalog_dirs:
         meta_file = module_dir / "meta.yaml"
-        if not meta_file.exists():
+        key = _stat_key(meta_file)
+        cached = _catalog_meta.get(module_dir)
+        if key is None:
+            if cached is not None:
+                del _catalog_meta[module_dir]
+                changed = True
+            continue
+        if cached is not None and cached[0] == key and not force:
             continue
         meta = yaml.safe_load(meta_file.read_text())
         meta["dir"] = str(module_dir)
-        modules.append(meta)
+        _catalog_meta[module_dir] = (key, meta)
+        changed = True
+
+    if changed:
+        modules = [meta for _, meta in _catalog_meta.values()]
+        modules.sort(key=lambda m: (m.get("order", 999), m["dir"]))
+        _catalog_modules = modules
+        _catalog_by_id = {m["id"]: m for m in modules}
+        _catalog_changed()
+
 
-    modules.sort(key=lambda m: m.get("order", 999))
-    return modules
+def _copy_module(meta: dict) -> dict:
+    """Per-request copy of a cached module; routes annotate lessons in place."""
+    module = dict(meta)
+    module["lessons"] = [dict(lesson) for lesson in meta.get("lessons", [])]
+    return module
+
+
+def reload_catalog() -> None:
+    """Explicit reload signal: re-scan COURSE_DIR and re-parse every meta.yaml.
+
+    In bundle mode (COURSE_BUNDLE set) the bundle file is re-read instead.
+    """
+    if COURSE_BUNDLE:
+        load_course_bundle(COURSE_BUNDLE)
+    else:
+        _refresh_catalog(force=True)
+
+
+def load_modules() -> list[dict]:
+    """Load all modules sorted by order."""
+    if _bundle is not None:
+        return [_copy_module(m) for m in _bundle["modules"]]
+    _refresh_catalog()
+    return [_copy_module(m) for m in _catalog_modules]
 
 
 def load_module(module_id: str) -> dict | None:
     """Load a single module by id."""
-    modules = load_modules()
-    for m in modules:
-        if m["id"] == module_id:
-            return m
-    return None
+    if _bundle is not None:
+        meta = _bundle["by_id"].get(module_id)
+    else:
+        _refresh_catalog()
+        meta = _catalog_by_id.get(module_id)
+    return _copy_module(meta) if meta else None
 
 
 def load_lesson(module_id: str, lesson_slug: str) -> dict | None:
@@ -83,6 +329,24 @@ def load_lesson(module_id: str, lesson_slug: str) -> dict | None:
     if not module:
         return None
 
+    if _bundle is not None:
+        compiled = _bundle["lessons"].get(f"{module_id}::{lesson_slug}")
+        if compiled is None:
+            return None
+        lessons = module["lessons"]
+        index = compiled["lesson_index"]
+        return {
+            "module": module,
+            "lesson": lessons[index],
+            "lesson_index": index,
+            "content_html": compiled["content_html"],
+            "highlighted": _bundle.get("highlighted", False),
+            "prev_lesson": lessons[index - 1] if index > 0 else None,
+            "next_lesson": lessons[index + 1] if index < len(lessons) - 1 else None,
+            "lesson_id": f"{module_id}::{lesson_slug}",
+            "total_lessons": len(lessons),
+        }
+
     # Find lesson in module meta
     lesson_meta = None
     lesson_index = 0
@@ -101,7 +365,7 @@ def load_lesson(module_id: str, lesson_slug: str) -> dict | None:
     if not lesson_file.exists():
         content_html = f"<p><em>Content file not found: {lesson_meta['file']}</em></p>"
     else:
-        content_html = render_markdown(lesson_file.read_text())
+        content_html = render_markdown_cached(lesson_file.read_text())
 
     lessons = module.get("lessons", [])
     prev_lesson = lessons[lesson_index - 1] if lesson_index > 0 else None
@@ -112,6 +376,7 @@ def load_lesson(module_id: str, lesson_slug: str) -> dict | None:
         "lesson": lesson_meta,
         "lesson_index": lesson_index,
         "content_html": content_html,
+        "highlighted": highlight.SERVER_HIGHLIGHT,
         "prev_lesson": prev_lesson,
         "next_lesson": next_lesson,
         "lesson_id": f"{module_id}::{lesson_slug}",
@@ -119,8 +384,52 @@ def load_lesson(module_id: str, lesson_slug: str) -> dict | None:
     }
 
 
+def lesson_fingerprints() -> dict[str, tuple]:
+    """{lesson_id: fingerprint} for every lesson; a fingerprint changes whenever
+    the lesson's titles or markdown might have (stat-based, nothing is read)."""
+    out = {}
+    for module in load_modules():
+        for lesson in module.get("lessons", []):
+            if _bundle is not None:
+                source = _bundle["content_hash"]
+            else:
+                source = _stat_key(Path(module["dir"]) / lesson["file"])
+            out[f"{module['id']}::{lesson['slug']}"] = (module["title"], lesson["title"], source)
+    return out
+
+
+def source_stamp(module_id: str, lesson_slug: str | None = None) -> tuple[str, float] | None:
+    """(fingerprint, mtime) of a lesson's markdown — or, without a slug, of the
+    module's quiz — from a stat, without reading or rendering anything.
+
+    None when the module, lesson or quiz doesn't exist. In bundle mode the
+    fingerprint is the bundle's content hash and the mtime 0.
+    """
+    module = load_module(module_id)
+    if not module:
+        return None
+    if lesson_slug is None:
+        if _bundle is not None:
+            return (_bundle["content_hash"], 0.0) if module_id in _bundle["quizzes"] else None
+        path = Path(module["dir"]) / module.get("quiz_file", "quiz.yaml")
+    else:
+        lesson = next((l for l in module.get("lessons", []) if l["slug"] == lesson_slug), None)
+        if lesson is None:
+            return None
+        if _bundle is not None:
+            return (_bundle["content_hash"], 0.0)
+        path = Path(module["dir"]) / lesson["file"]
+    key = _stat_key(path)
+    if key is None:
+        return None
+    return (f"{key[0]}-{key[1]}", key[0] / 1e9)
+
+
 def load_quiz(module_id: str) -> dict | None:
     """Load a module's quiz."""
+    if _bundle is not None:
+        return _bundle["quizzes"].get(module_id)
+
     module = load_module(module_id)
     if not module:
         return None
@@ -135,6 +444,139 @@ def load_quiz(module_id: str) -> dict | None:
     return yaml.safe_load(quiz_file.read_text())
 
 
+def prune_render_cache_dir(max_bytes: int | None = None) -> dict:
+    """Drop orphaned entries from RENDER_CACHE_DIR and enforce its size cap.
+
+    An entry is orphaned when it was produced by another renderer version or
+    its markdown no longer matches any lesson in the catalog. Remaining entries
+    are evicted oldest-first until the directory fits in max_bytes.
+    """
+    report = {"removed": 0, "kept": 0, "bytes_before": 0, "bytes_after": 0}
+    if not RENDER_CACHE_DIR or not Path(RENDER_CACHE_DIR).is_dir():
+        return report
+    if max_bytes is None:
+        max_bytes = RENDER_CACHE_DIR_MAX_BYTES
+
+    live = set()
+    for module in load_modules():
+        for lesson in module.get("lessons", []):
+            try:
+                text = (Path(module["dir"]) / lesson["file"]).read_text()
+            except OSError:
+                continue
+            live.add(_disk_path(_render_key(text)).name)
+
+    entries = []
+    stale_tmp_before = time.time() - 3600
+    for path in Path(RENDER_CACHE_DIR).iterdir():
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        report["bytes_before"] += st.st_size
+        if path.name.startswith(".tmp-"):
+            orphan = st.st_mtime < stale_tmp_before  # crashed writer
+            if not orphan:
+                continue
+        else:
+            orphan = path.name not in live
+        if orphan:
+            path.unlink(missing_ok=True)
+            report["removed"] += 1
+        else:
+            entries.append((st.st_mtime, st.st_size, path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    while entries and total > max_bytes:
+        _, size, path = entries.pop(0)
+        path.unlink(missing_ok=True)
+        total -= size
+        report["removed"] += 1
+
+    report["kept"] = len(entries)
+    report["bytes_after"] = total
+    return report
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Course bundle
+#
+# `python3 scripts/compile_course.py` snapshots COURSE_DIR into one JSON file:
+# the catalog, every quiz and every lesson's pre-rendered HTML. Pointing
+# COURSE_BUNDLE at that file makes the app load it once at startup and never
+# touch the course tree again.
+# ─────────────────────────────────────────────────────────────────────────────
+
+COURSE_BUNDLE = os.environ.get("COURSE_BUNDLE", "")
+BUNDLE_FORMAT = 1
+
+_bundle: dict | None = None
+
+
+def compile_course_bundle() -> dict:
+    """Build a bundle dict from the current COURSE_DIR."""
+    modules = load_modules()
+    lessons = {}
+    quizzes = {}
+    for module in modules:
+        for lesson in module.get("lessons", []):
+            data = load_lesson(module["id"], lesson["slug"])
+            lessons[data["lesson_id"]] = {
+                "lesson_index": data["lesson_index"],
+                "content_html": data["content_html"],
+            }
+        quiz = load_quiz(module["id"])
+        if quiz:
+            quizzes[module["id"]] = quiz
+
+    body = json.dumps([modules, lessons, quizzes], sort_keys=True, ensure_ascii=False)
+    return {
+        "format": BUNDLE_FORMAT,
+        "renderer_version": RENDERER_VERSION,
+        "highlighted": highlight.SERVER_HIGHLIGHT,
+        "content_hash": hashlib.sha256(body.encode("utf-8")).hexdigest(),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "modules": modules,
+        "lessons": lessons,
+        "quizzes": quizzes,
+    }
+
+
+def write_course_bundle(path: str | Path, bundle: dict | None = None) -> dict:
+    """Compile (unless given) and atomically write a bundle to path."""
+    if bundle is None:
+        bundle = compile_course_bundle()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(bundle, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+    return bundle
+
+
+def load_course_bundle(path: str | Path) -> dict:
+    """Switch the content layer to serve from a compiled bundle."""
+    global _bundle
+    bundle = json.loads(Path(path).read_text(encoding="utf-8"))
+    if bundle.get("format") != BUNDLE_FORMAT:
+        raise ValueError(
+            f"Course bundle {path} has format {bundle.get('format')!r}, "
+            f"expected {BUNDLE_FORMAT}; rebuild it with scripts/compile_course.py"
+        )
+    bundle["by_id"] = {m["id"]: m for m in bundle["modules"]}
+    _bundle = bundle
+    _catalog_changed()
+    return bundle
+
+
+def unload_course_bundle() -> None:
+    """Go back to reading COURSE_DIR directly."""
+    global _bundle
+    _bundle = None
+    _catalog_changed()
+
+
 def get_all_progress_ids(modules: list[dict]) -> set[str]:
     """Get all possible lesson IDs for progress calculation."""
     ids = set()
@@ -1,34 +1,361 @@
 """SQLite database helpers for progress tracking."""
 import os
 import json
+import asyncio
+import logging
 import aiosqlite
+from collections import OrderedDict
+from collections.abc import Collection
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
 DB_PATH = os.environ.get("DB_PATH", "/data/progress.db")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "4"))
+DB_CACHE_KB = int(os.environ.get("DB_CACHE_KB", "8192"))
 
+logger = logging.getLogger(__name__)
 
-async def get_db() -> aiosqlite.Connection:
-    db = await aiosqlite.connect(DB_PATH)
+# Applied to every connection. WAL lets readers run alongside the writer, and
+# with WAL synchronous=NORMAL only fsyncs at checkpoints.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA cache_size=-{DB_CACHE_KB}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+async def _connect() -> aiosqlite.Connection:
+    # sqlite3 keeps up to `cached_statements` prepared statements per
+    # connection, so long-lived connections skip re-preparing our queries.
+    db = await aiosqlite.connect(DB_PATH, cached_statements=256)
     db.row_factory = aiosqlite.Row
+    for pragma in _PRAGMAS:
+        await db.execute(pragma)
     return db
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Connection pool
+#
+# open_pool() (called from the FastAPI lifespan) keeps DB_POOL_SIZE reader
+# connections plus one writer connection open for the life of the process.
+# SQLite allows a single writer at a time, so writes are serialised on an
+# asyncio.Lock instead of contending on the file lock. Without a pool (scripts,
+# tests) each helper opens a short-lived connection with the same PRAGMAs.
+# ─────────────────────────────────────────────────────────────────────────────
+
+_readers: asyncio.Queue | None = None
+_reader_conns: list[aiosqlite.Connection] = []
+_writer: aiosqlite.Connection | None = None
+_write_lock: asyncio.Lock | None = None
+
+
+async def open_pool(size: int | None = None):
+    """Open the long-lived reader/writer connections."""
+    global _readers, _writer, _write_lock
+    if _writer is not None:
+        return
+    size = DB_POOL_SIZE if size is None else size
+    _writer = await _connect()
+    _write_lock = asyncio.Lock()
+    _readers = asyncio.Queue()
+    for _ in range(max(size, 1)):
+        conn = await _connect()
+        _reader_conns.append(conn)
+        _readers.put_nowait(conn)
+    await start_write_behind()
+    start_maintenance()
+
+
+async def close_pool():
+    """Close every pooled connection (lifespan shutdown)."""
+    global _readers, _writer, _write_lock
+    await stop_maintenance()
+    await stop_write_behind()
+    drop_progress_cache()
+    for conn in _reader_conns:
+        await conn.close()
+    _reader_conns.clear()
+    if _writer is not None:
+        await _writer.close()
+    _readers = _writer = _write_lock = None
+
+
+@asynccontextmanager
+async def _read():
+    if _readers is None:
+        db = await _connect()
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+    db = await _readers.get()
+    try:
+        yield db
+    finally:
+        _readers.put_nowait(db)
+
+
+@asynccontextmanager
+async def _write():
+    """Writer connection; commits on success, rolls back on error."""
+    if _writer is None:
+        db = await _connect()
+        try:
+            yield db
+            await db.commit()
+        finally:
+            await db.close()
+        return
+    async with _write_lock:
+        try:
+            yield _writer
+            await _writer.commit()
+        except BaseException:
+            await _writer.rollback()
+            raise
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Write-behind queue
+#
+# With DB_WRITE_BEHIND=1, progress and quiz writes are queued and a background
+# task commits them in batches of up to DB_BATCH_SIZE statements, waiting at
+# most DB_BATCH_WINDOW_MS for a batch to fill, so a burst of clicks costs one
+# commit instead of one per click. DB_WRITE_DURABILITY picks when callers
+# return:
+#   commit  — after the batch holding their write has committed (group commit)
+#   enqueue — as soon as the write is queued; a crash can lose the last window
+# The queue is flushed on lifespan shutdown (close_pool). If the writer task
+# dies, its batch fails (waiters get the error, enqueue-mode writes drop the
+# learner's cached progress) and a new task takes over the queue.
+# ─────────────────────────────────────────────────────────────────────────────
+
+DB_WRITE_BEHIND = os.environ.get("DB_WRITE_BEHIND", "0") == "1"
+DB_WRITE_DURABILITY = os.environ.get("DB_WRITE_DURABILITY", "commit")
+DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", "64"))
+DB_BATCH_WINDOW_MS = float(os.environ.get("DB_BATCH_WINDOW_MS", "5"))
+
+_write_queue: asyncio.Queue | None = None
+_write_task: asyncio.Task | None = None
+_writes_pending = 0
+_inflight: list | None = None  # the batch the writer task is collecting or committing
+
+# A queued item: ([(sql, params), ...], future-or-None, learner-or-None). The
+# statements of one item always commit together.
+_Statements = list[tuple[str, tuple]]
+_Item = tuple[_Statements, asyncio.Future | None, str | None]
+
+
+async def _execute_batch(batch: list[_Item]):
+    async with _write() as db:
+        for statements, _, _ in batch:
+            for sql, params in statements:
+                await db.execute(sql, params)
+
+
+def _lost_write(user_id: str | None, error: BaseException):
+    """An enqueue-mode write failed after its caller returned and the progress
+    cache was updated: drop the learner's entry so it is re-read from SQLite."""
+    logger.error("write-behind: dropped write: %s", error)
+    if user_id is None:
+        return
+    if _progress is not None:
+        _progress.pop(user_id, None)
+    _bump_version(user_id)
+
+
+def _resolve(item: _Item, error: BaseException | None):
+    _, fut, user_id = item
+    if fut is None:
+        if error is not None:
+            _lost_write(user_id, error)
+    elif not fut.done():
+        if error is None:
+            fut.set_result(None)
+        else:
+            fut.set_exception(error)
+
+
+async def _commit_batch(batch: list[_Item]):
+    global _writes_pending
+    try:
+        await _execute_batch(batch)
+        results = [None] * len(batch)
+    except Exception:
+        # Isolate the failing item(s) so one bad write can't sink the batch.
+        results = []
+        for item in batch:
+            try:
+                await _execute_batch([item])
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+    for item, error in zip(batch, results):
+        _resolve(item, error)
+    _writes_pending -= len(batch)
+
+
+async def _drain_writes(queue: asyncio.Queue):
+    """Background task: collect queued writes into batches and commit them."""
+    global _inflight
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await queue.get()
+        if item is None:
+            break
+        batch = _inflight = [item]
+        deadline = loop.time() + DB_BATCH_WINDOW_MS / 1000
+        while len(batch) < DB_BATCH_SIZE:
+            try:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                else:
+                    item = queue.get_nowait()
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        await _commit_batch(batch)
+        _inflight = None
+
+
+def _start_drain(queue: asyncio.Queue):
+    global _write_task
+    _write_task = asyncio.create_task(_drain_writes(queue))
+    _write_task.add_done_callback(lambda task: _drain_done(task, queue))
+
+
+def _drain_done(task: asyncio.Task, queue: asyncio.Queue):
+    """If the writer task died, fail the batch it held and start a new one, so
+    no caller waits forever and the rest of the queue still commits."""
+    global _inflight, _writes_pending
+    if task.cancelled() or task.exception() is None:
+        return
+    error = task.exception()
+    logger.error("write-behind: writer task failed, restarting: %r", error)
+    batch, _inflight = _inflight or [], None
+    for item in batch:
+        # A flush_writes() barrier has nothing to lose; let its reader go on.
+        _resolve(item, error if item[0] else None)
+    _writes_pending -= len(batch)
+    if queue is not _write_queue:
+        queue.put_nowait(None)  # stop_write_behind() may have lost its sentinel with the batch
+    _start_drain(queue)
+
+
+async def start_write_behind():
+    """Start the batching writer task (no-op unless DB_WRITE_BEHIND is on)."""
+    global _write_queue
+    if not DB_WRITE_BEHIND or _write_task is not None:
+        return
+    _write_queue = asyncio.Queue()
+    _start_drain(_write_queue)
+
+
+async def stop_write_behind():
+    """Commit everything still queued, then stop the writer task."""
+    global _write_queue, _write_task
+    if _write_task is None:
+        return
+    queue = _write_queue
+    _write_queue = None  # new writes go straight to SQLite from here on
+    await queue.put(None)
+    # A task that fails is replaced (by _drain_done) before this wait returns
+    task = None
+    while task is not _write_task:
+        task = _write_task
+        await asyncio.wait([task])
+    _write_task = None
+
+
+async def flush_writes():
+    """Wait until every write queued so far has committed."""
+    if _write_queue is None or not _writes_pending:
+        return
+    barrier = asyncio.get_running_loop().create_future()
+    await _enqueue([], barrier, None)
+    await barrier
+
+
+async def _enqueue(statements: _Statements, fut: asyncio.Future | None, user_id: str | None):
+    global _writes_pending
+    _writes_pending += 1
+    await _write_queue.put((statements, fut, user_id))
+
+
+async def _submit(statements: _Statements, user_id: str | None = None):
+    """Run statements in one transaction, directly or via the write-behind queue.
+
+    `user_id` names the learner whose cached progress the write updates, so a
+    lost enqueue-mode write can invalidate it.
+    """
+    if _write_queue is None:
+        async with _write() as db:
+            for sql, params in statements:
+                await db.execute(sql, params)
+        return
+    if DB_WRITE_DURABILITY == "enqueue":
+        await _enqueue(statements, None, user_id)
+        return
+    fut = asyncio.get_running_loop().create_future()
+    await _enqueue(statements, fut, user_id)
+    await fut
+
+
+async def get_db() -> aiosqlite.Connection:
+    return await _connect()
+
+
+# Progress written before learners existed belongs to this learner, and it is
+# who everybody is in single-learner mode.
+DEFAULT_LEARNER = "local"
+
+# PRAGMA user_version of the current schema; init_db() migrates older files.
+SCHEMA_VERSION = 3
+
+
+async def _columns(db: aiosqlite.Connection, table: str) -> set[str]:
+    return {row[1] for row in await db.execute_fetchall(f"PRAGMA table_info({table})")}
+
+
 async def init_db():
-    """Create tables if they don't exist."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    """Create tables if they don't exist and migrate older schemas."""
+    async with _write() as db:
+        # Lets run_maintenance() hand free pages back to the filesystem. Set
+        # before the first table on a new file; converting an existing file
+        # takes one full VACUUM (once, here at startup).
+        if (await db.execute_fetchall("PRAGMA auto_vacuum"))[0][0] != 2:
+            await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            await db.execute("VACUUM")
+    async with _write() as db:
+        await db.execute("BEGIN IMMEDIATE")
+        version = (await db.execute_fetchall("PRAGMA user_version"))[0][0]
         await db.execute("""
-            CREATE TABLE IF NOT EXISTS lessons (
-                id TEXT PRIMARY KEY,
+            CREATE TABLE IF NOT EXISTS lesson_progress (
+                user_id TEXT NOT NULL,
+                lesson_id TEXT NOT NULL,
                 module_id TEXT NOT NULL,
                 lesson_slug TEXT NOT NULL,
                 completed INTEGER DEFAULT 0,
                 completed_at TEXT,
-                notes TEXT
-            )
+                notes TEXT,
+                PRIMARY KEY (user_id, lesson_id)
+            ) WITHOUT ROWID
         """)
         await db.execute("""
             CREATE TABLE IF NOT EXISTS quiz_attempts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL DEFAULT 'local',
                 quiz_id TEXT NOT NULL,
                 score INTEGER NOT NULL,
                 total INTEGER NOT NULL,
@@ -36,73 +363,378 @@ async def init_db():
                 attempted_at TEXT NOT NULL
             )
         """)
+        # Best attempt per learner and quiz, kept current by save_quiz_attempt()
+        # so get_quiz_best() is a primary-key lookup however long the history.
         await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_lessons_module
-            ON lessons(module_id)
+            CREATE TABLE IF NOT EXISTS quiz_best (
+                user_id TEXT NOT NULL,
+                quiz_id TEXT NOT NULL,
+                attempt_id INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                answers_json TEXT NOT NULL,
+                attempted_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, quiz_id)
+            ) WITHOUT ROWID
         """)
-        await db.commit()
+        if version < 1:
+            await _migrate_single_learner(db)
+        if version < 2:
+            await _backfill_quiz_best(db)
+        if version < 3:
+            # Re-encode old pretty-printed answers the way _encode_answers() does.
+            for table in ("quiz_attempts", "quiz_best"):
+                await db.execute(
+                    f"UPDATE {table} SET answers_json = json(answers_json) WHERE json_valid(answers_json)"
+                )
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_progress_user_module
+            ON lesson_progress(user_id, module_id)
+        """)
+        # Covering index for get_completed_counts(): seeks straight to one
+        # learner's completed rows, already grouped by module.
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_progress_user_completed_module
+            ON lesson_progress(user_id, completed, module_id)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user_quiz
+            ON quiz_attempts(user_id, quiz_id, score DESC, attempted_at DESC)
+        """)
+        await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
 
-async def mark_lesson_complete(lesson_id: str, module_id: str, lesson_slug: str):
-    async with aiosqlite.connect(DB_PATH) as db:
-        now = datetime.now(timezone.utc).isoformat()
+async def _migrate_single_learner(db: aiosqlite.Connection):
+    """v0 → v1: move the single-user `lessons` table into lesson_progress and
+    give quiz_attempts an owner; existing rows go to DEFAULT_LEARNER."""
+    tables = {row[0] for row in await db.execute_fetchall(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    )}
+    if "lessons" in tables:
         await db.execute("""
-            INSERT INTO lessons (id, module_id, lesson_slug, completed, completed_at)
-            VALUES (?, ?, ?, 1, ?)
-            ON CONFLICT(id) DO UPDATE SET completed=1, completed_at=?
-        """, (lesson_id, module_id, lesson_slug, now, now))
-        await db.commit()
+            INSERT OR IGNORE INTO lesson_progress
+                (user_id, lesson_id, module_id, lesson_slug, completed, completed_at, notes)
+            SELECT ?, id, module_id, lesson_slug, completed, completed_at, notes FROM lessons
+        """, (DEFAULT_LEARNER,))
+        await db.execute("DROP TABLE lessons")
+    if "user_id" not in await _columns(db, "quiz_attempts"):
+        await db.execute(
+            f"ALTER TABLE quiz_attempts ADD COLUMN user_id TEXT NOT NULL DEFAULT '{DEFAULT_LEARNER}'"
+        )
 
 
-async def mark_lesson_incomplete(lesson_id: str, module_id: str, lesson_slug: str):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("""
-            INSERT INTO lessons (id, module_id, lesson_slug, completed, completed_at)
-            VALUES (?, ?, ?, 0, NULL)
-            ON CONFLICT(id) DO UPDATE SET completed=0, completed_at=NULL
-        """, (lesson_id, module_id, lesson_slug))
-        await db.commit()
-
-
-async def get_progress() -> dict:
-    """Return {lesson_id: {completed, completed_at}} for all lessons."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute("SELECT * FROM lessons")
-        rows = await cursor.fetchall()
+async def _backfill_quiz_best(db: aiosqlite.Connection):
+    """v1 → v2: fill quiz_best from the existing attempt history."""
+    await db.execute("""
+        INSERT OR REPLACE INTO quiz_best
+            (user_id, quiz_id, attempt_id, score, total, answers_json, attempted_at)
+        SELECT user_id, quiz_id, id, score, total, answers_json, attempted_at FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY user_id, quiz_id
+                ORDER BY score DESC, attempted_at DESC, id DESC
+            ) AS rank
+            FROM quiz_attempts
+        ) WHERE rank = 1
+    """)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Progress cache
+#
+# Progress only changes through mark_lesson_complete/incomplete, so once
+# load_progress_cache() has enabled it (from the lifespan) each learner's
+# progress is read from SQLite once, kept in an LRU of PROGRESS_CACHE_USERS
+# learners, and updated by writes after they commit. Every write bumps that
+# learner's progress_version(), which downstream caches can key on. The cache
+# is per process: run a single worker, or set PROGRESS_CACHE=0 to read SQLite
+# on every request.
+# ─────────────────────────────────────────────────────────────────────────────
+
+PROGRESS_CACHE = os.environ.get("PROGRESS_CACHE", "1") != "0"
+PROGRESS_CACHE_USERS = int(os.environ.get("PROGRESS_CACHE_USERS", "10000"))
+
+_PROGRESS_COLUMNS = "lesson_id AS id, module_id, lesson_slug, completed, completed_at, notes"
+
+# {user_id: {"modules": {module_id: {lesson_id: row}}, "completed": {module_id: n}}}
+_progress: OrderedDict[str, dict] | None = None
+# {user_id: version}, most recently written last and bounded like _progress.
+# Learners dropped from it report _version_floor, the highest version dropped
+# so far, so a learner's version never goes back to one an ETag was built from.
+_versions: OrderedDict[str, int] = OrderedDict()
+_version_floor = 0
+_version_counter = 0
+
+
+async def load_progress_cache():
+    """Enable (and empty) the in-memory progress cache."""
+    global _progress
+    _progress = OrderedDict() if PROGRESS_CACHE else None
+
+
+def drop_progress_cache():
+    """Forget cached progress; reads go back to SQLite."""
+    global _progress
+    _progress = None
+
+
+def progress_version(user_id: str) -> int:
+    """Monotonic per-learner counter, bumped on every progress or quiz write in this process."""
+    return _versions.get(user_id, _version_floor)
+
+
+def _bump_version(user_id: str):
+    global _version_counter, _version_floor
+    _version_counter += 1
+    _versions[user_id] = _version_counter
+    _versions.move_to_end(user_id)
+    while len(_versions) > PROGRESS_CACHE_USERS:
+        _, dropped = _versions.popitem(last=False)
+        _version_floor = max(_version_floor, dropped)
+
+
+async def _learner_progress(user_id: str) -> dict | None:
+    """Cached progress for one learner, loaded on first use; None if caching is off."""
+    if _progress is None:
+        return None
+    entry = _progress.get(user_id)
+    if entry is not None:
+        _progress.move_to_end(user_id)
+        return entry
+
+    version = progress_version(user_id)
+    await flush_writes()
+    async with _read() as db:
+        rows = await db.execute_fetchall(
+            f"SELECT {_PROGRESS_COLUMNS} FROM lesson_progress WHERE user_id = ?", (user_id,)
+        )
+    entry = {"modules": {}, "completed": {}}
+    for row in rows:
+        row = dict(row)
+        entry["modules"].setdefault(row["module_id"], {})[row["id"]] = row
+        if row["completed"]:
+            entry["completed"][row["module_id"]] = entry["completed"].get(row["module_id"], 0) + 1
+    # A write that landed while we were reading would be missing from `rows`.
+    if _progress is not None and progress_version(user_id) == version:
+        _progress[user_id] = entry
+        while len(_progress) > PROGRESS_CACHE_USERS:
+            _progress.popitem(last=False)
+    return entry
+
+
+def _cache_lesson_state(user_id: str, lesson_id: str, module_id: str, lesson_slug: str, completed: int, completed_at: str | None):
+    _bump_version(user_id)
+    entry = _progress.get(user_id) if _progress is not None else None
+    if entry is None:
+        return
+    rows = entry["modules"].setdefault(module_id, {})
+    row = rows.get(lesson_id)
+    was_completed = bool(row and row["completed"])
+    if row is None:
+        row = rows[lesson_id] = {"id": lesson_id, "module_id": module_id, "lesson_slug": lesson_slug, "notes": None}
+    row["completed"] = completed
+    row["completed_at"] = completed_at
+    if was_completed != bool(completed):
+        counts = entry["completed"]
+        counts[module_id] = counts.get(module_id, 0) + (1 if completed else -1)
+
+
+async def mark_lesson_complete(user_id: str, lesson_id: str, module_id: str, lesson_slug: str):
+    now = datetime.now(timezone.utc).isoformat()
+    await _submit([("""
+        INSERT INTO lesson_progress (user_id, lesson_id, module_id, lesson_slug, completed, completed_at)
+        VALUES (?, ?, ?, ?, 1, ?)
+        ON CONFLICT(user_id, lesson_id) DO UPDATE SET completed=1, completed_at=?
+    """, (user_id, lesson_id, module_id, lesson_slug, now, now))], user_id)
+    _cache_lesson_state(user_id, lesson_id, module_id, lesson_slug, 1, now)
+
+
+async def mark_lesson_incomplete(user_id: str, lesson_id: str, module_id: str, lesson_slug: str):
+    await _submit([("""
+        INSERT INTO lesson_progress (user_id, lesson_id, module_id, lesson_slug, completed, completed_at)
+        VALUES (?, ?, ?, ?, 0, NULL)
+        ON CONFLICT(user_id, lesson_id) DO UPDATE SET completed=0, completed_at=NULL
+    """, (user_id, lesson_id, module_id, lesson_slug))], user_id)
+    _cache_lesson_state(user_id, lesson_id, module_id, lesson_slug, 0, None)
+
+
+async def get_progress(user_id: str) -> dict:
+    """Return {lesson_id: {completed, completed_at}} for all of a learner's lessons."""
+    entry = await _learner_progress(user_id)
+    if entry is not None:
+        return {lid: dict(row) for rows in entry["modules"].values() for lid, row in rows.items()}
+    await flush_writes()
+    async with _read() as db:
+        rows = await db.execute_fetchall(
+            f"SELECT {_PROGRESS_COLUMNS} FROM lesson_progress WHERE user_id = ?", (user_id,)
+        )
         return {row["id"]: dict(row) for row in rows}
 
 
-async def get_module_progress(module_id: str) -> dict:
-    """Return progress for a specific module."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT * FROM lessons WHERE module_id = ?", (module_id,)
+async def get_completed_counts(user_id: str, lesson_ids: Collection[str] | None = None) -> dict[str, int]:
+    """Return {module_id: completed lesson count} (cached, or aggregated in SQL).
+
+    With `lesson_ids` only those lessons count, so rows left behind by lessons
+    since renamed or removed from the catalog don't inflate the totals.
+    """
+    entry = await _learner_progress(user_id)
+    if entry is not None:
+        if lesson_ids is None:
+            return {mid: n for mid, n in entry["completed"].items() if n}
+        counts: dict[str, int] = {}
+        for mid, rows in entry["modules"].items():
+            n = sum(1 for lid, row in rows.items() if row["completed"] and lid in lesson_ids)
+            if n:
+                counts[mid] = n
+        return counts
+    await flush_writes()
+    async with _read() as db:
+        if lesson_ids is None:
+            rows = await db.execute_fetchall("""
+                SELECT module_id, COUNT(*) FROM lesson_progress
+                WHERE user_id = ? AND completed = 1
+                GROUP BY module_id
+            """, (user_id,))
+        else:
+            rows = await db.execute_fetchall("""
+                SELECT module_id, COUNT(*) FROM lesson_progress
+                WHERE user_id = ? AND completed = 1
+                  AND lesson_id IN (SELECT value FROM json_each(?))
+                GROUP BY module_id
+            """, (user_id, json.dumps(sorted(lesson_ids))))
+        return {row[0]: row[1] for row in rows}
+
+
+async def get_module_progress(user_id: str, module_id: str) -> dict:
+    """Return a learner's progress for a specific module."""
+    entry = await _learner_progress(user_id)
+    if entry is not None:
+        return {lid: dict(row) for lid, row in entry["modules"].get(module_id, {}).items()}
+    await flush_writes()
+    async with _read() as db:
+        rows = await db.execute_fetchall(
+            f"SELECT {_PROGRESS_COLUMNS} FROM lesson_progress WHERE user_id = ? AND module_id = ?",
+            (user_id, module_id),
         )
-        rows = await cursor.fetchall()
         return {row["id"]: dict(row) for row in rows}
 
 
-async def save_quiz_attempt(quiz_id: str, score: int, total: int, answers: dict):
-    async with aiosqlite.connect(DB_PATH) as db:
-        now = datetime.now(timezone.utc).isoformat()
-        await db.execute("""
-            INSERT INTO quiz_attempts (quiz_id, score, total, answers_json, attempted_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (quiz_id, score, total, json.dumps(answers), now))
-        await db.commit()
+def _encode_answers(answers: dict) -> str:
+    """Compact JSON; unanswered questions are left out rather than stored as ""."""
+    return json.dumps({k: v for k, v in answers.items() if v}, separators=(",", ":"), ensure_ascii=False)
 
 
-async def get_quiz_best(quiz_id: str) -> dict | None:
-    """Return the best quiz attempt."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute("""
-            SELECT * FROM quiz_attempts
-            WHERE quiz_id = ?
-            ORDER BY score DESC, attempted_at DESC
-            LIMIT 1
-        """, (quiz_id,))
-        row = await cursor.fetchone()
+async def save_quiz_attempt(user_id: str, quiz_id: str, score: int, total: int, answers: dict):
+    now = datetime.now(timezone.utc).isoformat()
+    answers_json = _encode_answers(answers)
+    # Both statements commit together; ties go to the newer attempt, matching
+    # the ORDER BY score DESC, attempted_at DESC this table replaces.
+    await _submit([
+        ("""
+            INSERT INTO quiz_attempts (user_id, quiz_id, score, total, answers_json, attempted_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (user_id, quiz_id, score, total, answers_json, now)),
+        ("""
+            INSERT INTO quiz_best (user_id, quiz_id, attempt_id, score, total, answers_json, attempted_at)
+            VALUES (?, ?, last_insert_rowid(), ?, ?, ?, ?)
+            ON CONFLICT(user_id, quiz_id) DO UPDATE SET
+                attempt_id=excluded.attempt_id, score=excluded.score, total=excluded.total,
+                answers_json=excluded.answers_json, attempted_at=excluded.attempted_at
+            WHERE excluded.score >= quiz_best.score
+        """, (user_id, quiz_id, score, total, answers_json, now)),
+    ], user_id)
+    _bump_version(user_id)
+
+
+async def get_quiz_best(user_id: str, quiz_id: str) -> dict | None:
+    """Return a learner's best quiz attempt."""
+    await flush_writes()  # read-your-writes under DB_WRITE_DURABILITY=enqueue
+    async with _read() as db:
+        async with db.execute("""
+            SELECT attempt_id AS id, user_id, quiz_id, score, total, answers_json, attempted_at
+            FROM quiz_best
+            WHERE user_id = ? AND quiz_id = ?
+        """, (user_id, quiz_id)) as cursor:
+            row = await cursor.fetchone()
         return dict(row) if row else None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Maintenance
+#
+# Every DB_MAINTENANCE_HOURS (0 disables) a background task started by
+# open_pool() trims quiz history to the QUIZ_HISTORY_KEEP most recent attempts
+# per learner and quiz (the best attempt is always kept), refreshes planner
+# statistics, returns free pages to the filesystem and truncates the WAL.
+# ─────────────────────────────────────────────────────────────────────────────
+
+DB_MAINTENANCE_HOURS = float(os.environ.get("DB_MAINTENANCE_HOURS", "24"))
+QUIZ_HISTORY_KEEP = int(os.environ.get("QUIZ_HISTORY_KEEP", "20"))
+
+_maintenance_task: asyncio.Task | None = None
+
+
+async def _db_bytes(db: aiosqlite.Connection) -> int:
+    pages = (await db.execute_fetchall("PRAGMA page_count"))[0][0]
+    page_size = (await db.execute_fetchall("PRAGMA page_size"))[0][0]
+    return pages * page_size
+
+
+async def run_maintenance(keep: int | None = None) -> dict:
+    """Prune quiz history, ANALYZE and incrementally vacuum. Returns a size report."""
+    keep = QUIZ_HISTORY_KEEP if keep is None else keep
+    await flush_writes()
+    async with _write() as db:
+        bytes_before = await _db_bytes(db)
+        cursor = await db.execute("""
+            DELETE FROM quiz_attempts WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, quiz_id ORDER BY attempted_at DESC, id DESC
+                    ) AS n
+                    FROM quiz_attempts
+                ) WHERE n > ?
+            ) AND id NOT IN (SELECT attempt_id FROM quiz_best)
+        """, (keep,))
+        pruned = cursor.rowcount
+        await db.execute("ANALYZE")
+    async with _write() as db:
+        # incremental_vacuum frees one page per step, so read it to the end.
+        await db.execute_fetchall("PRAGMA incremental_vacuum")
+    async with _write() as db:
+        await db.execute_fetchall("PRAGMA wal_checkpoint(TRUNCATE)")
+        bytes_after = await _db_bytes(db)
+    report = {"pruned": pruned, "bytes_before": bytes_before, "bytes_after": bytes_after}
+    logger.info(
+        "maintenance: pruned %d quiz attempts, %.1f MB -> %.1f MB",
+        pruned, bytes_before / 1048576, bytes_after / 1048576,
+    )
+    return report
+
+
+async def _maintenance_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_maintenance()
+        except Exception:
+            logger.exception("maintenance failed")
+
+
+def start_maintenance():
+    """Schedule run_maintenance() (no-op when DB_MAINTENANCE_HOURS is 0)."""
+    global _maintenance_task
+    if DB_MAINTENANCE_HOURS <= 0 or _maintenance_task is not None:
+        return
+    _maintenance_task = asyncio.create_task(_maintenance_loop(DB_MAINTENANCE_HOURS * 3600))
+
+
+async def stop_maintenance():
+    global _maintenance_task
+    if _maintenance_task is None:
+        return
+    _maintenance_task.cancel()
+    try:
+        await _maintenance_task
+    except asyncio.CancelledError:
+        pass
+    _maintenance_task = None
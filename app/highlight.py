@@ -0,0 +1,111 @@
+"""Server-side syntax highlighting that emits highlight.js class names.
+
+Code fences are tokenised once with Pygments while rendering a lesson, and the
+tokens are wrapped in the same `hljs-*` spans highlight.js would produce, so
+the existing github-dark theme styles them and the browser no longer needs to
+load or run highlight.js. Without Pygments installed (or with
+SERVER_HIGHLIGHT=0) nothing is highlighted here and pages fall back to
+client-side highlighting.
+"""
+import os
+from html import escape
+
+try:
+    from pygments import lex
+    from pygments.lexers import get_lexer_by_name
+    from pygments.token import Comment, Generic, Keyword, Literal, Name, Operator, String, Number, Token
+    from pygments.util import ClassNotFound
+except ImportError:  # pragma: no cover - pygments is in requirements.txt
+    lex = None
+
+SERVER_HIGHLIGHT = lex is not None and os.environ.get("SERVER_HIGHLIGHT", "1") != "0"
+
+# Fence languages Pygments doesn't know under the name authors use.
+_LEXER_ALIASES = {
+    "jsonl": "json",
+    "yml": "yaml",
+    "shell": "bash",
+    "zsh": "bash",
+}
+
+# Languages whose Name.Tag tokens are mapping keys (hljs-attr) rather than
+# markup tags (hljs-name).
+_KEY_TAG_LANGUAGES = {"json", "json5", "jsonl", "yaml", "yml", "toml"}
+
+if lex is not None:
+    # Most specific first; a token type falls back to its nearest mapped parent.
+    _HLJS_CLASSES = {
+        Keyword.Constant: "hljs-literal",
+        Keyword.Type: "hljs-type",
+        Keyword: "hljs-keyword",
+        Operator.Word: "hljs-keyword",
+        Name.Builtin: "hljs-built_in",
+        Name.Function: "hljs-title function_",
+        Name.Class: "hljs-title class_",
+        Name.Exception: "hljs-title class_",
+        Name.Decorator: "hljs-meta",
+        Name.Tag: "hljs-name",
+        Name.Attribute: "hljs-attr",
+        Name.Variable: "hljs-variable",
+        Name.Constant: "hljs-variable",
+        Name.Label: "hljs-symbol",
+        String.Regex: "hljs-regexp",
+        String.Interpol: "hljs-subst",
+        String: "hljs-string",
+        Number: "hljs-number",
+        Literal.Scalar: "hljs-string",
+        Literal: "hljs-literal",
+        Comment.Preproc: "hljs-meta",
+        Comment.Hashbang: "hljs-meta",
+        Comment: "hljs-comment",
+        Generic.Deleted: "hljs-deletion",
+        Generic.Inserted: "hljs-addition",
+        Generic.Heading: "hljs-section",
+        Generic.Subheading: "hljs-section",
+        Generic.Emph: "hljs-emphasis",
+        Generic.Strong: "hljs-strong",
+    }
+
+_class_cache: dict = {}
+
+
+def _hljs_class(ttype, lang: str) -> str | None:
+    key = (ttype, lang in _KEY_TAG_LANGUAGES)
+    if key in _class_cache:
+        return _class_cache[key]
+    css = None
+    t = ttype
+    while t is not Token:
+        if t in _HLJS_CLASSES:
+            css = _HLJS_CLASSES[t]
+            break
+        t = t.parent
+    if css == "hljs-name" and key[1]:
+        css = "hljs-attr"
+    _class_cache[key] = css
+    return css
+
+
+def highlight(code: str, lang: str) -> str | None:
+    """Return escaped, hljs-classed HTML for code, or None if lang is unknown."""
+    if not SERVER_HIGHLIGHT:
+        return None
+    try:
+        lexer = get_lexer_by_name(_LEXER_ALIASES.get(lang, lang), stripnl=False, ensurenl=False)
+    except ClassNotFound:
+        return None
+
+    out = []
+    run_css, run = None, []
+    for ttype, value in lex(code, lexer):
+        css = _hljs_class(ttype, lang)
+        if css != run_css and run:
+            text = escape("".join(run), quote=False)
+            out.append(f'<span class="{run_css}">{text}</span>' if run_css else text)
+            run = []
+        run_css = css
+        run.append(value)
+    if run:
+        text = escape("".join(run), quote=False)
+        out.append(f'<span class="{run_css}">{text}</span>' if run_css else text)
+    return "".join(out)
@@ -1,13 +1,23 @@
 """OpenClaw Academy — FastAPI application."""
 import os
+import re
+import time
+import uuid
+import asyncio
+import hashlib
+import signal
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import FastAPI, Request, Form, HTTPException, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from app.database import init_db, mark_lesson_complete, mark_lesson_incomplete, get_progress, get_module_progress, save_quiz_attempt, get_quiz_best
-from app.content import load_modules, load_module, load_lesson, load_quiz, get_all_progress_ids
+from app.database import DEFAULT_LEARNER, progress_version, init_db, open_pool, close_pool, load_progress_cache, mark_lesson_complete, mark_lesson_incomplete, get_progress, get_completed_counts, get_module_progress, save_quiz_attempt, get_quiz_best
+from app import database, search, vendor
+from app.compression import CompressionMiddleware
+from app.content import catalog_version, catalog_modified, source_stamp, load_modules, load_module, load_lesson, load_quiz, get_all_progress_ids, reload_catalog, prune_render_cache_dir, COURSE_BUNDLE
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -15,111 +25,385 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await open_pool()
+    await load_progress_cache()
+    reload_catalog()  # loads COURSE_BUNDLE instead when it is set
+    if not COURSE_BUNDLE:
+        prune_render_cache_dir()
+    search.sync()
+    # `kill -HUP <pid>` re-scans the course tree (useful with CONTENT_RELOAD=0)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _reload_content)
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        pass
     yield
+    search.close()
+    await close_pool()
+
+
+def _reload_content():
+    reload_catalog()
+    search.sync()
 
 
 app = FastAPI(title="OpenClaw Academy", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
 
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+templates.env.globals.update(vendor_assets=vendor.page_assets, vendor_tag=vendor.tag)
 
 
-def _enrich_modules(modules: list[dict], progress: dict) -> list[dict]:
-    """Add progress counts to each module."""
-    for m in modules:
-        lessons = m.get("lessons", [])
-        total = len(lessons)
-        done = sum(
-            1 for l in lessons
-            if progress.get(f"{m['id']}::{l['slug']}", {}).get("completed", 0)
+# ─────────────────────────────────────────────────────────────────────────────
+# LEARNER IDENTITY
+#
+# LEARNER_MODE=single (default) keeps the original behaviour: everyone shares
+# DEFAULT_LEARNER. "cookie" gives each browser an anonymous id in a long-lived
+# cookie; "header" trusts LEARNER_HEADER set by an authenticating proxy and
+# falls back to the cookie when it is absent.
+# ─────────────────────────────────────────────────────────────────────────────
+
+LEARNER_MODE = os.environ.get("LEARNER_MODE", "single")
+LEARNER_HEADER = os.environ.get("LEARNER_HEADER", "X-Learner-Id")
+LEARNER_COOKIE = "ocademy_learner"
+LEARNER_COOKIE_MAX_AGE = 400 * 24 * 3600
+
+_LEARNER_ID = re.compile(r"[A-Za-z0-9_.@:-]{1,128}")
+
+
+def _valid_learner(value: str | None) -> str | None:
+    return value if value and _LEARNER_ID.fullmatch(value) else None
+
+
+@app.middleware("http")
+async def resolve_learner(request: Request, call_next):
+    if LEARNER_MODE == "single":
+        learner = DEFAULT_LEARNER
+    else:
+        learner = LEARNER_MODE == "header" and _valid_learner(request.headers.get(LEARNER_HEADER))
+        learner = learner or _valid_learner(request.cookies.get(LEARNER_COOKIE))
+    request.state.learner_id = learner or None
+    request.state.minted_learner = None
+    response = await call_next(request)
+    # A shared page may be stored by a CDN, so the cookie waits for the
+    # progress fragment the page loads right after.
+    minted = request.state.minted_learner
+    if minted and not response.headers.get("cache-control", "").startswith("public"):
+        response.set_cookie(
+            LEARNER_COOKIE, minted, max_age=LEARNER_COOKIE_MAX_AGE, httponly=True, samesite="lax"
         )
+    return response
+
+
+async def current_learner(request: Request) -> str:
+    """The request's learner. New anonymous ids are minted here, so only routes
+    that depend on a learner (pages, progress) set the cookie; static files
+    and the search API stay cookie-free and cacheable."""
+    if request.state.learner_id is None:
+        request.state.learner_id = request.state.minted_learner = uuid.uuid4().hex
+    return request.state.learner_id
+
+
+class ProgressSnapshot:
+    """Request-scoped view of progress: each query runs at most once per request.
+
+    The page body, the sidebar and _enrich_modules all read through the same
+    snapshot, so a route never fetches the same progress data twice.
+    """
+
+    def __init__(self, learner: str):
+        self.learner = learner
+        self._counts: dict[str, int] | None = None
+        self._modules: dict[str, dict] = {}
+        self._all: dict | None = None
+
+    async def completed_counts(self) -> dict[str, int]:
+        if self._counts is None:
+            lesson_ids = catalog_lesson_ids()
+            if self._all is not None:
+                counts: dict[str, int] = {}
+                for lesson_id, row in self._all.items():
+                    if row["completed"] and lesson_id in lesson_ids:
+                        counts[row["module_id"]] = counts.get(row["module_id"], 0) + 1
+                self._counts = counts
+            else:
+                self._counts = await get_completed_counts(self.learner, lesson_ids)
+        return self._counts
+
+    async def module(self, module_id: str) -> dict:
+        if self._all is not None:
+            prefix = f"{module_id}::"
+            return {k: v for k, v in self._all.items() if k.startswith(prefix)}
+        if module_id not in self._modules:
+            self._modules[module_id] = await get_module_progress(self.learner, module_id)
+        return self._modules[module_id]
+
+    async def all(self) -> dict:
+        if self._all is None:
+            self._all = await get_progress(self.learner)
+        return self._all
+
+
+async def progress_snapshot(learner: str = Depends(current_learner)) -> ProgressSnapshot:
+    return ProgressSnapshot(learner)
+
+
+_lesson_ids: tuple[int, frozenset[str]] = (-1, frozenset())
+
+
+def catalog_lesson_ids() -> frozenset[str]:
+    """Progress ids ("module::slug") of every lesson in the current catalog."""
+    global _lesson_ids
+    version = catalog_version()
+    if _lesson_ids[0] != version:
+        _lesson_ids = (version, frozenset(get_all_progress_ids(load_modules())))
+    return _lesson_ids[1]
+
+
+def _enrich_modules(modules: list[dict], completed_counts: dict[str, int]) -> list[dict]:
+    """Add progress counts (from ProgressSnapshot.completed_counts) to each module."""
+    for m in modules:
+        total = len(m.get("lessons", []))
+        done = completed_counts.get(m["id"], 0)
         m["progress_done"] = done
         m["progress_total"] = total
         m["progress_pct"] = int((done / total * 100) if total else 0)
     return modules
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# SIDEBAR
+#
+# The module sidebar is the same HTML for every page a learner visits until
+# the catalog or their progress changes, so it is rendered from _sidebar.html
+# once per (catalog version, learner, progress version, active module) and
+# kept in an LRU of SIDEBAR_CACHE_SIZE entries. Like the validators below it
+# relies on per-process progress versions, so it is bypassed when
+# PROGRESS_CACHE is off. Without a snapshot it renders the progress-free
+# sidebar that SHARED_PAGES sends to everyone.
+# ─────────────────────────────────────────────────────────────────────────────
+
+SIDEBAR_CACHE_SIZE = int(os.environ.get("SIDEBAR_CACHE_SIZE", "1024"))
+
+_sidebar_cache: OrderedDict[tuple, str] = OrderedDict()
+
+
+async def render_sidebar(snapshot: ProgressSnapshot | None, active_module: str | None = None) -> str:
+    key = None
+    if snapshot is None:
+        key = (catalog_version(), None, 0, active_module)
+    elif database.PROGRESS_CACHE:
+        key = (catalog_version(), snapshot.learner, progress_version(snapshot.learner), active_module)
+    if key is not None:
+        html = _sidebar_cache.get(key)
+        if html is not None:
+            _sidebar_cache.move_to_end(key)
+            return html
+
+    if snapshot is None:
+        all_modules = load_modules()
+    else:
+        all_modules = _enrich_modules(load_modules(), await snapshot.completed_counts())
+    html = templates.get_template("_sidebar.html").render(
+        all_modules=all_modules, active_module=active_module, show_progress=snapshot is not None
+    )
+    if key is not None:
+        _sidebar_cache[key] = html
+        while len(_sidebar_cache) > SIDEBAR_CACHE_SIZE:
+            _sidebar_cache.popitem(last=False)
+    return html
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONDITIONAL REQUESTS
+#
+# Pages carry an ETag built from everything they are rendered from — this
+# process (templates/code), the catalog version, the page's source file and
+# the learner's progress_version(). A request whose If-None-Match still
+# matches gets a 304 before any progress query or template rendering.
+# Personal pages send no Last-Modified: a progress change in the same second
+# as the last response would look unmodified at its one-second granularity.
+# Shared pages, which carry no progress, also honour If-Modified-Since.
+# Progress versions are per process, so personal validators are only sent
+# while PROGRESS_CACHE is on (the single-worker setup).
+# ─────────────────────────────────────────────────────────────────────────────
+
+BOOT_ID = uuid.uuid4().hex
+BOOT_TIME = time.time()
+
+
+def _validators(parts: tuple, last_modified: float | None, cache_control: str) -> dict[str, str]:
+    key = "|".join(map(str, (BOOT_ID, catalog_version(), *parts)))
+    validators = {
+        "ETag": f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"',
+        "Cache-Control": cache_control,
+    }
+    if last_modified is not None:
+        validators["Last-Modified"] = formatdate(max(BOOT_TIME, catalog_modified(), last_modified), usegmt=True)
+    return validators
+
+
+def _page_validators(learner: str, *parts) -> dict[str, str] | None:
+    if not database.PROGRESS_CACHE:
+        return None
+    return _validators((learner, progress_version(learner), *parts), None, "private, no-cache")
+
+
+def _not_modified(request: Request, validators: dict[str, str] | None) -> Response | None:
+    """A 304 response if the client's copy is still current, else None."""
+    if validators is None:
+        return None
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        fresh = "*" in tags or validators["ETag"] in tags
+    elif "Last-Modified" in validators:
+        try:
+            since = parsedate_to_datetime(request.headers.get("if-modified-since", ""))
+            fresh = parsedate_to_datetime(validators["Last-Modified"]) <= since
+        except (TypeError, ValueError):
+            fresh = False
+    else:
+        fresh = False
+    return Response(status_code=304, headers=validators) if fresh else None
+
+
+def _with_validators(response: Response, validators: dict[str, str] | None) -> Response:
+    if validators:
+        response.headers.update(validators)
+    return response
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SHARED PAGES
+#
+# With SHARED_PAGES=1 the lesson, module and quiz pages are rendered without
+# anyone's progress, so every reader gets the same bytes, and they are sent
+# with a public Cache-Control that lets a CDN or reverse proxy keep them. Each
+# page then makes a single HTMX request to the matching /progress/module/...
+# route, whose hx-swap-oob elements fill in the completion button, checkmarks,
+# sidebar badges and best quiz score. Shared validators leave the learner out,
+# so they do not depend on PROGRESS_CACHE.
+# ─────────────────────────────────────────────────────────────────────────────
+
+SHARED_PAGES = os.environ.get("SHARED_PAGES", "0") == "1"
+SHARED_PAGE_MAX_AGE = int(os.environ.get("SHARED_PAGE_MAX_AGE", "300"))
+SHARED_PAGE_S_MAXAGE = int(os.environ.get("SHARED_PAGE_S_MAXAGE", "86400"))
+
+
+def _shared_validators(*parts, modified: float = 0.0) -> dict[str, str]:
+    return _validators(
+        ("shared", *parts),
+        modified,
+        f"public, max-age={SHARED_PAGE_MAX_AGE}, s-maxage={SHARED_PAGE_S_MAXAGE}",
+    )
+
+
+def _mark_lessons(module: dict, progress: dict) -> dict:
+    """Set each lesson's completion from `progress`; the module's progress totals."""
+    lessons = module.get("lessons", [])
+    for lesson in lessons:
+        row = progress.get(f"{module['id']}::{lesson['slug']}", {})
+        lesson["completed"] = row.get("completed", 0)
+        lesson["completed_at"] = row.get("completed_at")
+    done = sum(1 for l in lessons if l["completed"])
+    total = len(lessons)
+    return {"lessons": lessons, "done": done, "total": total, "pct": int((done / total * 100) if total else 0)}
+
+
+async def _progress_fragment(request: Request, snapshot: ProgressSnapshot, validators: dict | None, context: dict) -> Response:
+    sidebar_html = await render_sidebar(snapshot, context["module"]["id"])
+    return _with_validators(templates.TemplateResponse("_progress_fragment.html", {
+        "request": request,
+        **context,
+        "sidebar_html": sidebar_html,
+    }), validators)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ROUTES
 # ─────────────────────────────────────────────────────────────────────────────
 
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request):
-    modules = load_modules()
-    progress = await get_progress()
-    modules = _enrich_modules(modules, progress)
+async def index(request: Request, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
+    validators = _page_validators(snapshot.learner, "index")
+    not_modified = _not_modified(request, validators)
+    if not_modified:
+        return not_modified
+
+    modules = _enrich_modules(load_modules(), await snapshot.completed_counts())
 
     total_lessons = sum(m["progress_total"] for m in modules)
     total_done = sum(m["progress_done"] for m in modules)
     overall_pct = int((total_done / total_lessons * 100) if total_lessons else 0)
 
-    return templates.TemplateResponse("index.html", {
+    return _with_validators(templates.TemplateResponse("index.html", {
         "request": request,
         "modules": modules,
         "total_lessons": total_lessons,
         "total_done": total_done,
         "overall_pct": overall_pct,
-    })
+    }), validators)
 
 
 @app.get("/module/{module_id}", response_class=HTMLResponse)
-async def module_overview(request: Request, module_id: str):
+async def module_overview(request: Request, module_id: str, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
     module = load_module(module_id)
     if not module:
         raise HTTPException(status_code=404, detail="Module not found")
 
-    progress = await get_module_progress(module_id)
-    lessons = module.get("lessons", [])
-    for lesson in lessons:
-        lid = f"{module_id}::{lesson['slug']}"
-        lesson["completed"] = progress.get(lid, {}).get("completed", 0)
-        lesson["completed_at"] = progress.get(lid, {}).get("completed_at")
-
-    done = sum(1 for l in lessons if l["completed"])
-    total = len(lessons)
+    if SHARED_PAGES:
+        validators = _shared_validators("module", module_id)
+    else:
+        validators = _page_validators(snapshot.learner, "module", module_id)
+    not_modified = _not_modified(request, validators)
+    if not_modified:
+        return not_modified
 
-    # Also load all modules for sidebar
-    all_modules = load_modules()
-    all_progress = await get_progress()
-    all_modules = _enrich_modules(all_modules, all_progress)
+    progress = {} if SHARED_PAGES else await snapshot.module(module_id)
+    sidebar_html = await render_sidebar(None if SHARED_PAGES else snapshot, module_id)
 
-    return templates.TemplateResponse("module.html", {
+    return _with_validators(templates.TemplateResponse("module.html", {
         "request": request,
         "module": module,
-        "lessons": lessons,
-        "done": done,
-        "total": total,
-        "pct": int((done / total * 100) if total else 0),
-        "all_modules": all_modules,
-    })
+        **_mark_lessons(module, progress),
+        "sidebar_html": sidebar_html,
+        "progress_url": f"/progress/module/{module_id}" if SHARED_PAGES else None,
+    }), validators)
 
 
 @app.get("/module/{module_id}/lesson/{lesson_slug}", response_class=HTMLResponse)
-async def lesson_view(request: Request, module_id: str, lesson_slug: str):
+async def lesson_view(request: Request, module_id: str, lesson_slug: str, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
+    stamp = source_stamp(module_id, lesson_slug)
+    if SHARED_PAGES:
+        validators = stamp and _shared_validators("lesson", module_id, lesson_slug, stamp[0], modified=stamp[1])
+    else:
+        validators = stamp and _page_validators(snapshot.learner, "lesson", module_id, lesson_slug, stamp[0])
+    not_modified = _not_modified(request, validators)
+    if not_modified:
+        return not_modified
+
     lesson_data = load_lesson(module_id, lesson_slug)
     if not lesson_data:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
-    progress = await get_progress()
+    progress = {} if SHARED_PAGES else await snapshot.module(module_id)
     lesson_id = lesson_data["lesson_id"]
     is_completed = progress.get(lesson_id, {}).get("completed", 0)
 
-    all_modules = load_modules()
-    all_progress = await get_progress()
-    all_modules = _enrich_modules(all_modules, all_progress)
+    sidebar_html = await render_sidebar(None if SHARED_PAGES else snapshot, module_id)
 
-    # Mark progress for lessons in sidebar
-    for lesson in lesson_data["module"].get("lessons", []):
-        lid = f"{module_id}::{lesson['slug']}"
-        lesson["completed"] = all_progress.get(lid, {}).get("completed", 0)
+    # Mark progress for lessons in the module's lesson list
+    _mark_lessons(lesson_data["module"], progress)
 
-    return templates.TemplateResponse("lesson.html", {
+    return _with_validators(templates.TemplateResponse("lesson.html", {
         "request": request,
         **lesson_data,
         "is_completed": is_completed,
-        "all_modules": all_modules,
+        "sidebar_html": sidebar_html,
         "module_id": module_id,
-    })
+        "progress_url": f"/progress/module/{module_id}/lesson/{lesson_slug}" if SHARED_PAGES else None,
+    }), validators)
 
 
 @app.post("/progress/toggle", response_class=HTMLResponse)
@@ -129,59 +413,62 @@ async def toggle_progress(
     module_id: str = Form(...),
     lesson_slug: str = Form(...),
     currently_completed: int = Form(0),
+    learner: str = Depends(current_learner),
 ):
     """HTMX endpoint to toggle lesson completion."""
+    if lesson_id != f"{module_id}::{lesson_slug}" or lesson_id not in catalog_lesson_ids():
+        raise HTTPException(status_code=404, detail="Lesson not found")
+
     if currently_completed:
-        await mark_lesson_incomplete(lesson_id, module_id, lesson_slug)
+        await mark_lesson_incomplete(learner, lesson_id, module_id, lesson_slug)
         new_state = 0
     else:
-        await mark_lesson_complete(lesson_id, module_id, lesson_slug)
+        await mark_lesson_complete(learner, lesson_id, module_id, lesson_slug)
         new_state = 1
 
     # Return the updated toggle button
-    checked_class = "btn-success" if new_state else "btn-outline"
-    label = "✅ Completed" if new_state else "Mark Complete"
-    return HTMLResponse(f"""
-        <form hx-post="/progress/toggle" hx-target="#progress-btn-wrap" hx-swap="outerHTML">
-            <input type="hidden" name="lesson_id" value="{lesson_id}">
-            <input type="hidden" name="module_id" value="{module_id}">
-            <input type="hidden" name="lesson_slug" value="{lesson_slug}">
-            <input type="hidden" name="currently_completed" value="{new_state}">
-            <button type="submit" class="btn {checked_class}">{label}</button>
-        </form>
-    """)
+    button = templates.get_template("_progress.html").module.progress_button(lesson_id, module_id, lesson_slug, new_state)
+    return HTMLResponse(str(button))
 
 
 @app.get("/module/{module_id}/quiz", response_class=HTMLResponse)
-async def quiz_view(request: Request, module_id: str):
+async def quiz_view(request: Request, module_id: str, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
     module = load_module(module_id)
     if not module:
         raise HTTPException(status_code=404, detail="Module not found")
 
+    stamp = source_stamp(module_id)
+    if SHARED_PAGES:
+        validators = stamp and _shared_validators("quiz", module_id, stamp[0], modified=stamp[1])
+    else:
+        validators = stamp and _page_validators(snapshot.learner, "quiz", module_id, stamp[0])
+    not_modified = _not_modified(request, validators)
+    if not_modified:
+        return not_modified
+
     quiz = load_quiz(module_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found for this module")
 
-    best = await get_quiz_best(quiz["id"])
+    best = None if SHARED_PAGES else await get_quiz_best(snapshot.learner, quiz["id"])
 
-    all_modules = load_modules()
-    all_progress = await get_progress()
-    all_modules = _enrich_modules(all_modules, all_progress)
+    sidebar_html = await render_sidebar(None if SHARED_PAGES else snapshot, module_id)
 
-    return templates.TemplateResponse("quiz.html", {
+    return _with_validators(templates.TemplateResponse("quiz.html", {
         "request": request,
         "module": module,
         "quiz": quiz,
         "best": best,
-        "all_modules": all_modules,
+        "sidebar_html": sidebar_html,
         "module_id": module_id,
         "submitted": False,
         "results": None,
-    })
+        "progress_url": f"/progress/module/{module_id}/quiz" if SHARED_PAGES else None,
+    }), validators)
 
 
 @app.post("/module/{module_id}/quiz", response_class=HTMLResponse)
-async def quiz_submit(request: Request, module_id: str):
+async def quiz_submit(request: Request, module_id: str, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
     module = load_module(module_id)
     quiz = load_quiz(module_id)
     if not module or not quiz:
@@ -210,19 +497,17 @@ async def quiz_submit(request: Request, module_id: str):
     total = len(questions)
     score_pct = int((correct / total * 100) if total else 0)
 
-    await save_quiz_attempt(quiz["id"], correct, total, answers)
-    best = await get_quiz_best(quiz["id"])
+    await save_quiz_attempt(snapshot.learner, quiz["id"], correct, total, answers)
+    best = await get_quiz_best(snapshot.learner, quiz["id"])
 
-    all_modules = load_modules()
-    all_progress = await get_progress()
-    all_modules = _enrich_modules(all_modules, all_progress)
+    sidebar_html = await render_sidebar(snapshot, module_id)
 
     return templates.TemplateResponse("quiz.html", {
         "request": request,
         "module": module,
         "quiz": quiz,
         "best": best,
-        "all_modules": all_modules,
+        "sidebar_html": sidebar_html,
         "module_id": module_id,
         "submitted": True,
         "results": results,
@@ -233,19 +518,102 @@ async def quiz_submit(request: Request, module_id: str):
     })
 
 
+@app.get("/progress/module/{module_id}", response_class=HTMLResponse)
+async def module_progress(request: Request, module_id: str, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
+    """HTMX fragment: the learner's progress for a SHARED_PAGES module page."""
+    module = load_module(module_id)
+    if not module:
+        raise HTTPException(status_code=404, detail="Module not found")
+
+    validators = _page_validators(snapshot.learner, "progress", "module", module_id)
+    not_modified = _not_modified(request, validators)
+    if not_modified:
+        return not_modified
+
+    return await _progress_fragment(request, snapshot, validators, {
+        "page": "module",
+        "module": module,
+        **_mark_lessons(module, await snapshot.module(module_id)),
+    })
+
+
+@app.get("/progress/module/{module_id}/lesson/{lesson_slug}", response_class=HTMLResponse)
+async def lesson_progress(request: Request, module_id: str, lesson_slug: str, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
+    """HTMX fragment: the learner's progress for a SHARED_PAGES lesson page."""
+    module = load_module(module_id)
+    lesson = module and next((l for l in module.get("lessons", []) if l["slug"] == lesson_slug), None)
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+
+    validators = _page_validators(snapshot.learner, "progress", "lesson", module_id, lesson_slug)
+    not_modified = _not_modified(request, validators)
+    if not_modified:
+        return not_modified
+
+    progress = await snapshot.module(module_id)
+    lesson_id = f"{module_id}::{lesson_slug}"
+    _mark_lessons(module, progress)
+    return await _progress_fragment(request, snapshot, validators, {
+        "page": "lesson",
+        "module": module,
+        "lesson": lesson,
+        "lesson_id": lesson_id,
+        "is_completed": progress.get(lesson_id, {}).get("completed", 0),
+    })
+
+
+@app.get("/progress/module/{module_id}/quiz", response_class=HTMLResponse)
+async def quiz_progress(request: Request, module_id: str, snapshot: ProgressSnapshot = Depends(progress_snapshot)):
+    """HTMX fragment: the learner's best score for a SHARED_PAGES quiz page."""
+    module = load_module(module_id)
+    quiz = module and load_quiz(module_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found for this module")
+
+    validators = _page_validators(snapshot.learner, "progress", "quiz", module_id)
+    not_modified = _not_modified(request, validators)
+    if not_modified:
+        return not_modified
+
+    return await _progress_fragment(request, snapshot, validators, {
+        "page": "quiz",
+        "module": module,
+        "quiz": quiz,
+        "best": await get_quiz_best(snapshot.learner, quiz["id"]),
+    })
+
+
+@app.get("/search", response_class=HTMLResponse)
+async def search_view(request: Request, q: str = "", snapshot: ProgressSnapshot = Depends(progress_snapshot)):
+    results = search.search(q) if q.strip() else []
+    sidebar_html = await render_sidebar(snapshot)
+
+    return templates.TemplateResponse("search.html", {
+        "request": request,
+        "query": q,
+        "results": results,
+        "sidebar_html": sidebar_html,
+    })
+
+
+@app.get("/api/search")
+async def api_search(q: str = "", limit: int = 10):
+    results = search.search(q, limit=max(1, min(limit, 50)))
+    return JSONResponse({"query": q, "results": results})
+
+
 @app.get("/api/progress")
-async def api_progress():
-    progress = await get_progress()
-    modules = load_modules()
-    summary = []
-    for m in modules:
-        lessons = m.get("lessons", [])
-        done = sum(1 for l in lessons if progress.get(f"{m['id']}::{l['slug']}", {}).get("completed", 0))
-        summary.append({
+async def api_progress(snapshot: ProgressSnapshot = Depends(progress_snapshot)):
+    progress = await snapshot.all()
+    modules = _enrich_modules(load_modules(), await snapshot.completed_counts())
+    summary = [
+        {
             "module_id": m["id"],
             "title": m["title"],
-            "done": done,
-            "total": len(lessons),
-            "pct": int((done / len(lessons) * 100) if lessons else 0),
-        })
+            "done": m["progress_done"],
+            "total": m["progress_total"],
+            "pct": m["progress_pct"],
+        }
+        for m in modules
+    ]
     return JSONResponse({"modules": summary, "raw": progress})
@@ -0,0 +1,217 @@
+"""Full-text lesson search over an SQLite FTS5 index.
+
+The index is built from the same catalog app.content serves (course directory
+or compiled bundle) and kept current incrementally: sync() compares each
+lesson's stat fingerprint with the one recorded when it was indexed and only
+re-indexes lessons that were added, changed or removed. Searches sync first
+unless CONTENT_RELOAD=0, in which case the lifespan and SIGHUP do. The index
+lives in memory by default; point SEARCH_DB at a file to keep it across
+restarts.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from html import escape, unescape
+
+from app import content
+
+SEARCH_DB = os.environ.get("SEARCH_DB", ":memory:")
+
+# Private-use markers around matches; the text is escaped before they become <mark>.
+_MARK_OPEN, _MARK_CLOSE = "\ue000", "\ue001"
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+_synced = False
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(SEARCH_DB, check_same_thread=False)
+        _conn.executescript("""
+            CREATE TABLE IF NOT EXISTS search_docs (
+                rowid INTEGER PRIMARY KEY,
+                lesson_id TEXT NOT NULL UNIQUE,
+                module_id TEXT NOT NULL,
+                lesson_slug TEXT NOT NULL,
+                fingerprint TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                module_title, title, body,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+        """)
+    return _conn
+
+
+def close():
+    """Close the index connection (an in-memory index is discarded)."""
+    global _conn, _synced
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+        _synced = False
+
+
+def _plain_text(html: str) -> str:
+    return _SPACE.sub(" ", unescape(_TAG.sub(" ", html))).strip()
+
+
+def sync() -> dict:
+    """Bring the index in line with the catalog; returns what changed."""
+    global _synced
+    current = {lid: json.dumps(fp) for lid, fp in content.lesson_fingerprints().items()}
+    with _lock:
+        db = _connect()
+        indexed = dict(db.execute("SELECT lesson_id, fingerprint FROM search_docs"))
+        changed = [lid for lid, fp in current.items() if indexed.get(lid) != fp]
+        removed = [lid for lid in indexed if lid not in current]
+        _synced = True
+        if not changed and not removed:
+            return {"indexed": 0, "removed": 0}
+
+        with db:
+            for lid in removed + changed:
+                row = db.execute("SELECT rowid FROM search_docs WHERE lesson_id = ?", (lid,)).fetchone()
+                if row:
+                    db.execute("DELETE FROM search_fts WHERE rowid = ?", row)
+                    db.execute("DELETE FROM search_docs WHERE rowid = ?", row)
+            for lid in changed:
+                module_id, slug = lid.split("::", 1)
+                lesson = content.load_lesson(module_id, slug)
+                if lesson is None:
+                    continue
+                cursor = db.execute(
+                    "INSERT INTO search_docs (lesson_id, module_id, lesson_slug, fingerprint) VALUES (?, ?, ?, ?)",
+                    (lid, module_id, slug, current[lid]),
+                )
+                db.execute(
+                    "INSERT INTO search_fts (rowid, module_title, title, body) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, lesson["module"]["title"], lesson["lesson"]["title"],
+                     _plain_text(lesson["content_html"])),
+                )
+        return {"indexed": len(changed), "removed": len(removed)}
+
+
+def _match_expression(query: str) -> str | None:
+    """User text → FTS5 query: every term must match, the last one as a prefix."""
+    terms = _TERM.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _marked(text: str) -> str:
+    return escape(text).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def search(query: str, limit: int = 10) -> list[dict]:
+    """Ranked matches with escaped, <mark>-highlighted title and snippet HTML."""
+    expression = _match_expression(query)
+    if expression is None:
+        return []
+    if content.CONTENT_RELOAD or not _synced:
+        sync()
+    with _lock:
+        # ORDER BY the FTS5 rank column lets FTS5 return rows already ranked, so
+        # snippet()/highlight() only run for the `limit` rows kept.
+        rows = _connect().execute(f"""
+            SELECT d.lesson_id, d.module_id, d.lesson_slug,
+                   highlight(search_fts, 0, '{_MARK_OPEN}', '{_MARK_CLOSE}'),
+                   highlight(search_fts, 1, '{_MARK_OPEN}', '{_MARK_CLOSE}'),
+                   snippet(search_fts, 2, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 24),
+                   search_fts.rank
+            FROM search_fts JOIN search_docs d ON d.rowid = search_fts.rowid
+            WHERE search_fts MATCH ? AND search_fts.rank MATCH 'bm25(2.0, 10.0, 1.0)'
+            ORDER BY search_fts.rank
+            LIMIT ?
+        """, (expression, limit)).fetchall()
+    return [
+        {
+            "lesson_id": lesson_id,
+            "module_id": module_id,
+            "lesson_slug": slug,
+            "url": f"/module/{module_id}/lesson/{slug}",
+            "module_title_html": _marked(module_title),
+            "title_html": _marked(title),
+            "snippet_html": _marked(snippet),
+            "score": -rank,
+        }
+        for lesson_id, module_id, slug, module_title, title, snippet, rank in rows
+    ]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Static index
+#
+# The static export has no server, so export_static.py writes a prebuilt
+# inverted index next to the pages and app/static/js/search.js queries it in
+# the browser:
+#   index.json           docs [[url, title, module title, word count], ...]
+#                        plus the shard keys; the only file fetched up front
+#   terms-<key>.json     {term: [[doc, tf, pos, pos, ...], ...]} for terms whose
+#                        first STATIC_SHARD_PREFIX characters are <key>
+#   text-<doc>.json      plain text of one doc, fetched only to cut snippets
+#                        for the results shown
+# Terms are lower-cased \w+ runs, tokenised identically by search.js;
+# positions are word offsets (the first STATIC_POSITIONS per document).
+# ─────────────────────────────────────────────────────────────────────────────
+
+STATIC_INDEX_VERSION = 1
+STATIC_SHARD_PREFIX = 2
+STATIC_POSITIONS = 4
+
+_ASCII_ALNUM = re.compile(r"[a-z0-9]+")
+
+
+def _shard_key(term: str) -> str:
+    head = term[:STATIC_SHARD_PREFIX]
+    return head if _ASCII_ALNUM.fullmatch(head) else "_"
+
+
+def build_static_index() -> dict[str, object]:
+    """{file name: JSON-able object} for the static export's search index."""
+    docs, texts = [], []
+    shards: dict[str, dict[str, list]] = {}
+    for module in content.load_modules():
+        for meta in module.get("lessons", []):
+            lesson = content.load_lesson(module["id"], meta["slug"])
+            if lesson is None:
+                continue
+            doc = len(docs)
+            text = f"{meta['title']}. {_plain_text(lesson['content_html'])}"
+            words = _TERM.findall(text.lower())
+            docs.append([f"/module/{module['id']}/lesson/{meta['slug']}", meta["title"], module["title"], len(words)])
+            texts.append(text)
+
+            positions: dict[str, list[int]] = {}
+            for i, word in enumerate(words):
+                positions.setdefault(word, []).append(i)
+            for term, where in positions.items():
+                shards.setdefault(_shard_key(term), {}).setdefault(term, []).append(
+                    [doc, len(where), *where[:STATIC_POSITIONS]]
+                )
+
+    files: dict[str, object] = {
+        "index.json": {
+            "version": STATIC_INDEX_VERSION,
+            "prefix": STATIC_SHARD_PREFIX,
+            "docs": docs,
+            "shards": sorted(shards),
+        },
+    }
+    for key, terms in shards.items():
+        files[f"terms-{key}.json"] = terms
+    for doc, text in enumerate(texts):
+        files[f"text-{doc}.json"] = text
+    return files
@@ -0,0 +1,158 @@
+// OpenClaw Academy — static-export search
+//
+// Queries the prebuilt index written by scripts/export_static.py (format in
+// app/search.py, "Static index"). Nothing is fetched until the search box is
+// focused; then index.json, and per query only the term shards and lesson
+// texts it needs.
+
+(function () {
+  const BASE = '/static/search/';
+  const WORD = /[\p{L}\p{N}_]+/gu;
+  const LIMIT = 10;
+
+  let manifest = null;
+  const shards = {};
+  const texts = {};
+
+  const fetchJSON = name => fetch(BASE + name).then(r => {
+    if (!r.ok) throw new Error(name + ': ' + r.status);
+    return r.json();
+  });
+  const loadManifest = () => manifest || (manifest = fetchJSON('index.json'));
+  const loadShard = key => shards[key] || (shards[key] = fetchJSON('terms-' + key + '.json').catch(() => ({})));
+  const loadText = doc => texts[doc] || (texts[doc] = fetchJSON('text-' + doc + '.json').catch(() => ''));
+
+  const words = text => text.toLowerCase().match(WORD) || [];
+  const escapeHTML = s => s.replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+
+  function shardKey(m, term) {
+    const head = term.slice(0, m.prefix);
+    return /^[a-z0-9]+$/.test(head) ? head : '_';
+  }
+
+  // {doc: {tf, positions}} for one query term; the last term also matches as a prefix.
+  async function postings(m, term, prefix) {
+    const key = shardKey(m, term);
+    if (!m.shards.includes(key)) return new Map();
+    const shard = await loadShard(key);
+    const found = new Map();
+    const terms = prefix ? Object.keys(shard).filter(t => t.startsWith(term)) : (shard[term] ? [term] : []);
+    for (const t of terms) {
+      for (const [doc, tf, ...positions] of shard[t]) {
+        const hit = found.get(doc) || {tf: 0, positions: []};
+        hit.tf += tf;
+        hit.positions.push(...positions);
+        found.set(doc, hit);
+      }
+    }
+    return found;
+  }
+
+  async function search(query) {
+    const m = await loadManifest();
+    const terms = words(query);
+    if (!terms.length) return {terms, results: []};
+    const last = terms.length - 1;
+    const perTerm = await Promise.all(terms.map((t, i) => postings(m, t, i === last && t.length >= m.prefix)));
+
+    // Every term must match; rank with BM25 plus a bonus for title hits.
+    const avgLen = m.docs.reduce((sum, d) => sum + d[3], 0) / m.docs.length;
+    const scores = new Map();
+    perTerm[0].forEach((_, doc) => {
+      if (!perTerm.every(p => p.has(doc))) return;
+      const [, title, , len] = m.docs[doc];
+      const titleWords = words(title);
+      let score = 0;
+      perTerm.forEach((p, i) => {
+        const {tf} = p.get(doc);
+        const idf = Math.log(1 + (m.docs.length - p.size + 0.5) / (p.size + 0.5));
+        score += idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * len / avgLen));
+        if (titleWords.some(w => i === last ? w.startsWith(terms[i]) : w === terms[i])) score += 2;
+      });
+      scores.set(doc, score);
+    });
+
+    const ranked = [...scores.entries()].sort((a, b) => b[1] - a[1]).slice(0, LIMIT);
+    return {
+      terms,
+      results: ranked.map(([doc]) => ({
+        doc,
+        url: m.docs[doc][0],
+        title: m.docs[doc][1],
+        module: m.docs[doc][2],
+        positions: perTerm.flatMap(p => p.get(doc).positions),
+      })),
+    };
+  }
+
+  // ~24 words around the earliest indexed hit, matches wrapped in <mark>.
+  function snippet(text, terms, positions) {
+    const spans = [...text.matchAll(WORD)];
+    if (!spans.length) return '';
+    const isHit = w => terms.some((t, i) => i === terms.length - 1 ? w.startsWith(t) : w === t);
+    let at = Math.min(...positions);
+    if (!spans[at] || !isHit(spans[at][0].toLowerCase())) at = spans.findIndex(s => isHit(s[0].toLowerCase()));
+    if (at < 0) at = 0;
+    const from = Math.max(0, at - 8), to = Math.min(spans.length, at + 16);
+
+    let html = from > 0 ? '…' : '';
+    let cursor = spans[from].index;
+    for (let i = from; i < to; i++) {
+      const s = spans[i];
+      html += escapeHTML(text.slice(cursor, s.index));
+      html += isHit(s[0].toLowerCase()) ? '<mark>' + escapeHTML(s[0]) + '</mark>' : escapeHTML(s[0]);
+      cursor = s.index + s[0].length;
+    }
+    return html + (to < spans.length ? '…' : '');
+  }
+
+  function render(panel, found) {
+    if (!found.results.length) {
+      panel.innerHTML = '<div class="search-empty">No matching lessons</div>';
+      return;
+    }
+    panel.innerHTML = found.results.map(r =>
+      '<a class="search-result" href="' + escapeHTML(r.url) + '">'
+      + '<div class="lesson-item-meta">' + escapeHTML(r.module) + '</div>'
+      + '<div class="lesson-item-title">' + escapeHTML(r.title) + '</div>'
+      + '<div class="search-snippet" data-doc="' + r.doc + '"></div></a>'
+    ).join('');
+    found.results.forEach(r => loadText(r.doc).then(text => {
+      const el = panel.querySelector('[data-doc="' + r.doc + '"]');
+      if (el) el.innerHTML = snippet(text, found.terms, r.positions);
+    }));
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    const input = document.querySelector('[data-static-search]');
+    if (!input) return;
+    const panel = input.parentElement.querySelector('.search-dropdown');
+    let timer = null;
+    let latest = 0;
+
+    input.addEventListener('focus', loadManifest, {once: true});
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        const query = input.value.trim();
+        const ticket = ++latest;
+        if (!query) { panel.hidden = true; return; }
+        const found = await search(query);
+        if (ticket !== latest) return;  // a newer query finished first
+        render(panel, found);
+        panel.hidden = false;
+      }, 120);
+    });
+    input.addEventListener('keydown', e => {
+      if (e.key === 'Escape') { panel.hidden = true; input.blur(); }
+      if (e.key === 'Enter') {
+        e.preventDefault();
+        const first = panel.querySelector('a');
+        if (first) first.click();
+      }
+    });
+    document.addEventListener('click', e => {
+      if (!input.parentElement.contains(e.target)) panel.hidden = true;
+    });
+  });
+})();
@@ -0,0 +1,117 @@
+"""Pinned browser libraries: highlight.js, mermaid and htmx.
+
+vendor.lock.json pins each asset's CDN URL and sha256. `python3
+scripts/vendor_assets.py` downloads them once into app/static/vendor/; with
+those files committed, neither the app nor the static exporter needs the
+network. Pages link a local copy only if it matches its pinned hash. Anything
+not in the store is linked from its CDN, with the pinned hash as its
+`integrity` attribute. A copy that doesn't match is never served.
+
+With VENDOR_SUBSET=1 (the default) a page references only what its HTML
+uses:
+- the highlight.js theme, if it has code blocks
+- the highlight.js core and language packs, for code it leaves to the browser
+- mermaid, if it has a diagram
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from markupsafe import Markup, escape
+
+VENDOR_DIR = Path(__file__).parent / "static" / "vendor"
+LOCK_FILE = Path(__file__).parent / "vendor.lock.json"
+VENDOR_SUBSET = os.environ.get("VENDOR_SUBSET", "1") != "0"
+
+logger = logging.getLogger(__name__)
+
+_CODE_LANGUAGE = re.compile(r'<code class="(?:hljs )?language-([\w+#.-]+)"')
+
+_lock: dict[str, dict] | None = None
+_urls: dict[str, str] = {}
+
+
+def load_lock() -> dict[str, dict]:
+    global _lock
+    if _lock is None:
+        _lock = json.loads(LOCK_FILE.read_text())
+    return _lock
+
+
+def reset() -> None:
+    """Forget the lock and the checked URLs (after the store or lock changed)."""
+    global _lock
+    _lock = None
+    _urls.clear()
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def check(name: str) -> str:
+    """State of an asset's local copy: "ok", "missing", "unpinned" or "mismatch"."""
+    entry = load_lock()[name]
+    path = VENDOR_DIR / entry["file"]
+    if not path.is_file():
+        return "missing"
+    if not entry.get("sha256"):
+        return "unpinned"
+    return "ok" if file_sha256(path) == entry["sha256"] else "mismatch"
+
+
+def asset_url(name: str) -> str:
+    """Local URL of a verified copy, else the pinned CDN URL; checked once per process."""
+    if name not in _urls:
+        entry = load_lock()[name]
+        status = check(name)
+        if status == "mismatch":
+            logger.warning("vendor: %s does not match vendor.lock.json; linking %s", entry["file"], entry["url"])
+        _urls[name] = f"/static/vendor/{entry['file']}" if status == "ok" else entry["url"]
+    return _urls[name]
+
+
+def tag(name: str) -> Markup:
+    """<script> or <link> for an asset; CDN links carry the pinned hash as SRI."""
+    entry = load_lock()[name]
+    url = asset_url(name)
+    attrs = ""
+    if url == entry["url"] and entry.get("sha256"):
+        sri = base64.b64encode(bytes.fromhex(entry["sha256"])).decode()
+        attrs = f' integrity="sha256-{sri}" crossorigin="anonymous"'
+    if entry["file"].endswith(".css"):
+        return Markup(f'<link rel="stylesheet" href="{escape(url)}"{attrs}>')
+    return Markup(f'<script src="{escape(url)}"{attrs}></script>')
+
+
+def page_assets(html: str | None = None, highlighted: bool = False) -> list[str]:
+    """Names of the assets a page needs, in load order.
+
+    `html` is the page's rendered lesson body (None for pages without one) and
+    `highlighted` whether its code was already highlighted server-side.
+    """
+    lock = load_lock()
+    language_packs = [name for name, entry in lock.items() if entry.get("languages")]
+    if not VENDOR_SUBSET:
+        names = []
+        if html is not None:
+            names.append("highlight-css")
+            if not highlighted:
+                names += ["highlight", *language_packs]
+        return names + ["mermaid", "htmx"]
+
+    names = []
+    if html and "<pre><code" in html:
+        names.append("highlight-css")
+        if not highlighted:
+            languages = set(_CODE_LANGUAGE.findall(html))
+            names.append("highlight")
+            names += [name for name in language_packs if languages & set(lock[name]["languages"])]
+    if html and '<div class="mermaid">' in html:
+        names.append("mermaid")
+    names.append("htmx")
+    return names
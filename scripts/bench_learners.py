@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+OpenClaw Academy — Learner Scaling Benchmark
+
+Fills a scratch progress database with N learners (each with a realistic
+share of completed lessons and quiz attempts), then measures lesson-page
+latency for random learners through the ASGI app. With per-learner indexes
+and the per-learner progress cache, p50/p95 should stay flat as N grows.
+
+Usage:
+    python3 scripts/bench_learners.py [--learners 1000 10000 100000] [--requests 500]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+os.environ.setdefault("COURSE_DIR", str(REPO_ROOT / "course"))
+os.environ["LEARNER_MODE"] = "header"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import content, database  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def populate(path: str, learners: int, lesson_ids: list[tuple[str, str, str]], quiz_ids: list[str]):
+    """Bulk-insert progress rows straight into SQLite (much faster than the helpers)."""
+    rng = random.Random(learners)
+    conn = sqlite3.connect(path)
+    with conn:
+        for start in range(0, learners, 1000):
+            rows, attempts = [], []
+            for n in range(start, min(start + 1000, learners)):
+                user = f"learner-{n}"
+                for lesson_id, module_id, slug in rng.sample(lesson_ids, rng.randint(0, len(lesson_ids))):
+                    rows.append((user, lesson_id, module_id, slug, "2024-01-01T00:00:00+00:00"))
+                for quiz_id in rng.sample(quiz_ids, rng.randint(0, len(quiz_ids))):
+                    attempts.append((user, quiz_id, rng.randint(0, 10), 10, "{}", "2024-01-01T00:00:00+00:00"))
+            conn.executemany("""
+                INSERT INTO lesson_progress (user_id, lesson_id, module_id, lesson_slug, completed, completed_at)
+                VALUES (?, ?, ?, ?, 1, ?)
+            """, rows)
+            conn.executemany("""
+                INSERT INTO quiz_attempts (user_id, quiz_id, score, total, answers_json, attempted_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, attempts)
+    with conn:  # one attempt per learner and quiz, so every attempt is the best
+        conn.execute("""
+            INSERT INTO quiz_best (user_id, quiz_id, attempt_id, score, total, answers_json, attempted_at)
+            SELECT user_id, quiz_id, id, score, total, answers_json, attempted_at FROM quiz_attempts
+        """)
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def measure(learners: int, requests: int, urls: list[str]) -> list[float]:
+    rng = random.Random(0)
+    timings = []
+    with TestClient(app) as client:
+        for _ in range(requests):
+            headers = {"X-Learner-Id": f"learner-{rng.randrange(learners)}"}
+            url = rng.choice(urls)
+            start = time.perf_counter()
+            response = client.get(url, headers=headers)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, url
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--learners", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=500, help="lesson page views per run")
+    args = parser.parse_args()
+
+    modules = content.load_modules()
+    lesson_ids = [
+        (f"{m['id']}::{l['slug']}", m["id"], l["slug"]) for m in modules for l in m.get("lessons", [])
+    ]
+    quiz_ids = [q["id"] for q in (content.load_quiz(m["id"]) for m in modules) if q]
+    urls = [f"/module/{module_id}/lesson/{slug}" for _, module_id, slug in lesson_ids]
+
+    print("🦞 OpenClaw Academy — Learner Scaling Benchmark")
+    print("=" * 52)
+    print(f"  {len(lesson_ids)} lessons, {len(quiz_ids)} quizzes, {args.requests} page views per run\n")
+    print(f"  {'learners':>9}  {'rows':>10}  {'db MB':>7}  {'p50 ms':>7}  {'p95 ms':>7}")
+
+    for learners in args.learners:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_PATH = os.path.join(tmp, "progress.db")
+            asyncio.run(database.init_db())
+            populate(database.DB_PATH, learners, lesson_ids, quiz_ids)
+            rows = sqlite3.connect(database.DB_PATH).execute("SELECT COUNT(*) FROM lesson_progress").fetchone()[0]
+            size_mb = os.path.getsize(database.DB_PATH) / 1024 / 1024
+
+            timings = sorted(measure(learners, args.requests, urls))
+            p50 = statistics.median(timings) * 1000
+            p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+            print(f"  {learners:>9}  {rows:>10}  {size_mb:>7.1f}  {p50:>7.2f}  {p95:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
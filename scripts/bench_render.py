@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+OpenClaw Academy — Markdown Rendering Benchmark
+
+Compares the legacy render pipeline (new mistune parser per call + DOTALL
+regex passes for mermaid fences and blockquote callouts) against the current
+single-pass app.content.render_markdown over every lesson in course/.
+The comparison runs the pipeline with SERVER_HIGHLIGHT off, since the legacy
+renderer never highlighted; "pipeline+hl" reports the cost with Pygments on.
+
+Usage:
+    python3 scripts/bench_render.py [--rounds 20]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import mistune
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from app import highlight  # noqa: E402
+from app.content import render_markdown  # noqa: E402
+
+
+def legacy_render_markdown(text: str) -> str:
+    """The pre-pipeline renderer, kept verbatim for comparison."""
+    def mermaid_replace(match):
+        code = match.group(1).strip()
+        return f'<div class="mermaid">\n{code}\n</div>'
+
+    text = re.sub(r'```mermaid\n(.*?)```', mermaid_replace, text, flags=re.DOTALL)
+
+    md = mistune.create_markdown(renderer=mistune.HTMLRenderer(escape=False), plugins=['table', 'strikethrough', 'task_lists'])
+    html = md(text)
+
+    def callout_replace(match):
+        content = match.group(1)
+        if '<strong>Note:</strong>' in content or '<strong>📝</strong>' in content:
+            return f'<blockquote class="callout callout-note">{content}</blockquote>'
+        elif '<strong>Warning:</strong>' in content or '<strong>⚠️</strong>' in content:
+            return f'<blockquote class="callout callout-warning">{content}</blockquote>'
+        elif '<strong>Exercise:</strong>' in content or '<strong>🏋️</strong>' in content:
+            return f'<blockquote class="callout callout-exercise">{content}</blockquote>'
+        elif '<strong>Tip:</strong>' in content or '<strong>💡</strong>' in content:
+            return f'<blockquote class="callout callout-tip">{content}</blockquote>'
+        return f'<blockquote class="callout">{content}</blockquote>'
+
+    return re.sub(r'<blockquote>(.*?)</blockquote>', callout_replace, html, flags=re.DOTALL)
+
+
+def bench(fn, docs, rounds):
+    """Return the best seconds per corpus pass."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the corpus (best is reported)")
+    parser.add_argument("--course-dir", type=Path, default=REPO_ROOT / "course")
+    args = parser.parse_args()
+
+    docs = [p.read_text() for p in sorted(args.course_dir.glob("*/*.md"))]
+    if not docs:
+        print(f"No lessons found under {args.course_dir}")
+        sys.exit(1)
+    size_kb = sum(len(d.encode("utf-8")) for d in docs) / 1024
+
+    print("🦞 OpenClaw Academy — Render Benchmark")
+    print("=" * 52)
+    print(f"  Corpus: {len(docs)} lessons, {size_kb:.0f} KB, best of {args.rounds} rounds\n")
+
+    # (name, renderer, SERVER_HIGHLIGHT while it runs)
+    cases = [("legacy", legacy_render_markdown, False), ("pipeline", render_markdown, False)]
+    if highlight.lex is not None:
+        cases.append(("pipeline+hl", render_markdown, True))
+
+    results = {}
+    for name, fn, highlighted in cases:
+        highlight.SERVER_HIGHLIGHT = highlighted
+        fn(docs[0])  # warm imports / regex compilation
+        secs = bench(fn, docs, args.rounds)
+        results[name] = secs
+        print(f"  {name:<12} {secs * 1000:8.1f} ms/pass  "
+              f"{len(docs) / secs:8.0f} lessons/s  {size_kb / secs / 1024:6.2f} MB/s")
+
+    print(f"\n  Speed-up: {results['legacy'] / results['pipeline']:.2f}x (same work, no highlighting)")
+
+
+if __name__ == "__main__":
+    main()
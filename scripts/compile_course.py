@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+OpenClaw Academy — Course Compiler
+
+Compiles the course/ directory into a single versioned JSON bundle (module
+catalog, quizzes and pre-rendered lesson HTML). Run the app with
+COURSE_BUNDLE=<bundle> to serve from it instead of parsing YAML/markdown.
+
+Usage:
+    python3 scripts/compile_course.py [--course-dir course] [--output dist/course-bundle.json]
+    COURSE_BUNDLE=dist/course-bundle.json python3 -m uvicorn app.main:app
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile course/ into a single bundle file.")
+    parser.add_argument("--course-dir", type=Path, default=REPO_ROOT / "course")
+    parser.add_argument("--output", type=Path, default=REPO_ROOT / "dist" / "course-bundle.json")
+    args = parser.parse_args()
+
+    if not args.course_dir.is_dir():
+        print(f"ERROR: COURSE_DIR not found: {args.course_dir}")
+        sys.exit(1)
+
+    # app.content reads its configuration from the environment at import time
+    os.environ["COURSE_DIR"] = str(args.course_dir.resolve())
+    os.environ.pop("COURSE_BUNDLE", None)
+    sys.path.insert(0, str(REPO_ROOT))
+    from app.content import write_course_bundle
+
+    print("🦞 OpenClaw Academy — Compile Course")
+    print("=" * 52)
+    start = time.perf_counter()
+    bundle = write_course_bundle(args.output)
+    elapsed = time.perf_counter() - start
+
+    size_kb = args.output.stat().st_size / 1024
+    print(f"  ✓ {len(bundle['modules'])} modules, {len(bundle['lessons'])} lessons, "
+          f"{len(bundle['quizzes'])} quizzes")
+    print(f"  ✓ Format {bundle['format']}, renderer v{bundle['renderer_version']}, "
+          f"content {bundle['content_hash'][:12]}")
+    print(f"  ✓ Wrote {args.output} ({size_kb:.0f} KB) in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,44 @@ OpenClaw Academy — Static Site Exporter
 Exports the FastAPI app to a static dist/ directory for Vercel / GitHub Pages deployment.
 
 Features:
-- Crawls all 54+ pages (index, modules, lessons, quizzes)
-- Downloads CDN assets locally (highlight.js, mermaid.js, htmx)
+- Renders all 54+ pages (index, modules, lessons, quizzes) by calling the app
+  over ASGI in-process — no server or port (--engine server crawls uvicorn)
+- Bundles highlight.js, mermaid and htmx from the checksum-verified vendor store
+  (app/static/vendor/, filled by scripts/vendor_assets.py), downloading and
+  verifying pinned files it lacks; mismatched files fail the export, unpinned
+  ones stay on their CDN with a warning, and --require-vendor fails it on
+  anything unpinned or missing (no network)
 - Replaces HTMX progress toggle with localStorage-based client-side tracking
 - Replaces server-side quiz submission with client-side JS validator
+- Writes a sharded search index that static/js/search.js queries in the browser
+- Precompresses HTML/CSS/JS/JSON into .gz/.br siblings and reports the savings
 - Creates clean URL structure: /module/foo/index.html
 - Generates dist/index.html as entry point
+- Incremental: re-renders only pages whose inputs changed since the last run
+  (dist/.export-manifest.json); --clean rebuilds everything
+- Renders on a pool of --jobs worker processes and reports the slowest pages
+- Fingerprints CSS/JS into dist/assets/ (content hash in the name) and checks
+  that vercel.json serves them with an immutable Cache-Control rule
 
 Usage:
-    python3 scripts/export_static.py
+    python3 scripts/export_static.py [--engine inprocess|server] [--clean] [--jobs N] [--require-vendor]
     cd dist && python3 -m http.server 8090
     open http://localhost:8090
 """
 import os
 import re
 import sys
+import json
 import time
+import asyncio
+import argparse
+import hashlib
+import statistics
 import shutil
 import subprocess
 import urllib.request
 import urllib.error
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -33,48 +51,219 @@ from pathlib import Path
 PORT = 18765  # Unusual port to avoid conflicts
 BASE_URL = f"http://127.0.0.1:{PORT}"
 REPO_ROOT = Path(__file__).parent.parent
+APP_DIR = REPO_ROOT / "app"
 DIST_DIR = REPO_ROOT / "dist"
+VERCEL_CONFIG = REPO_ROOT / "vercel.json"
 COURSE_DIR = REPO_ROOT / "course"
 DB_PATH = "/tmp/academy-export.db"
 
-# CDN assets to bundle locally for offline use
-CDN_ASSETS = [
-    {
-        "url": "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/github-dark.min.css",
-        "local": "vendor/highlight.min.css",
-    },
-    {
-        "url": "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js",
-        "local": "vendor/highlight.min.js",
-    },
-    {
-        "url": "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/yaml.min.js",
-        "local": "vendor/highlight-yaml.min.js",
-    },
-    {
-        "url": "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/typescript.min.js",
-        "local": "vendor/highlight-typescript.min.js",
-    },
-    {
-        "url": "https://cdn.jsdelivr.net/npm/mermaid@11/dist/mermaid.min.js",
-        "local": "vendor/mermaid.min.js",
-    },
-    {
-        "url": "https://unpkg.com/htmx.org@2.0.4/dist/htmx.min.js",
-        "local": "vendor/htmx.min.js",
-    },
-]
-
 # ---------------------------------------------------------------------------
-# Server management
+# Page rendering
+#
+# Both engines have start() / fetch(path) -> HTML or None / stop(). The
+# in-process one imports app.main and calls it as an ASGI app on a private
+# event loop, running the lifespan startup/shutdown itself, so pages come
+# straight out of the route handlers with no sockets; it also works where
+# binding a port is not allowed. The server engine is the original crawl of a
+# uvicorn subprocess, kept for comparing output.
 # ---------------------------------------------------------------------------
 
-def start_server():
+def export_env(db_path=DB_PATH):
+    """Environment the app is rendered with (fresh progress DB, personal pages)."""
+    return {
+        "COURSE_DIR": str(COURSE_DIR),
+        "DB_PATH": db_path,
+        "DATA_DIR": "/tmp",
+        "SHARED_PAGES": "0",
+    }
+
+
+class InProcessEngine:
+    """Render pages by calling the ASGI app directly."""
+
+    name = "in-process"
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.loop = asyncio.new_event_loop()
+        self.app = None
+        self._lifespan_task = None
+        self._lifespan_in = asyncio.Queue()
+        self._lifespan_out = asyncio.Queue()
+
+    def start(self):
+        os.environ.update(export_env(self.db_path))
+        sys.path.insert(0, str(REPO_ROOT))
+        from app import content, database, main
+
+        # Modules imported earlier (write_search_index) read the old environment
+        content.COURSE_DIR = COURSE_DIR
+        database.DB_PATH = self.db_path
+        main.SHARED_PAGES = False
+        self.app = main.app
+        return self.loop.run_until_complete(self._lifespan("startup"))
+
+    def stop(self):
+        if self._lifespan_task is not None:
+            self.loop.run_until_complete(self._lifespan("shutdown"))
+        self.loop.close()
+
+    async def _lifespan(self, event):
+        if self._lifespan_task is None:
+            scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+            self._lifespan_task = asyncio.ensure_future(
+                self.app(scope, self._lifespan_in.get, self._lifespan_out.put)
+            )
+        await self._lifespan_in.put({"type": f"lifespan.{event}"})
+        reply = await self._lifespan_out.get()
+        if reply["type"].endswith(".failed"):
+            print(f"  ✗ {event} failed: {reply.get('message', '')}")
+            return False
+        if event == "shutdown":
+            await self._lifespan_task
+        return True
+
+    def fetch(self, path):
+        try:
+            status, body = self.loop.run_until_complete(self._get(path))
+        except Exception as e:
+            print(f"  WARNING: Failed to render {path}: {e}")
+            return None
+        if status != 200:
+            print(f"  WARNING: Failed to render {path}: HTTP {status}")
+            return None
+        return body.decode("utf-8")
+
+    async def _get(self, path):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"127.0.0.1")],
+            "client": ("127.0.0.1", 0),
+            "server": ("127.0.0.1", 80),
+            "state": {},
+        }
+        status = 500
+        chunks = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+class ServerEngine:
+    """Crawl a uvicorn subprocess over HTTP."""
+
+    name = "server"
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.proc = None
+
+    def start(self):
+        self.proc = start_server(self.db_path)
+        print(f"  Server PID {self.proc.pid} on port {PORT}...")
+        return wait_for_server()
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+    def fetch(self, path):
+        return fetch_page(path)
+
+
+ENGINES = {"inprocess": InProcessEngine, "server": ServerEngine}
+
+
+def render_batch(engine_name, paths, dist_dir, assets=None, db_path=DB_PATH):
+    """Start an engine, render, rewrite and save `paths`, stop it.
+
+    Runs in the exporter itself or as one --jobs worker process; each batch
+    gets its own progress DB. Returns (startup seconds or None if the app did
+    not start, [(path, saved file or None, seconds), ...] in `paths` order).
+    """
+    for suffix in ("", "-wal", "-shm"):
+        Path(db_path + suffix).unlink(missing_ok=True)
+    engine = ENGINES[engine_name](db_path)
+    started = time.perf_counter()
+    if not engine.start():
+        engine.stop()
+        return None, [(path, None, 0.0) for path in paths]
+    startup = time.perf_counter() - started
+
+    results = []
+    for path in paths:
+        started = time.perf_counter()
+        html = engine.fetch(path)
+        out = None
+        if html is not None:
+            out = save_page(path, rewrite_html(html, assets), dist_dir)
+        results.append((path, out, time.perf_counter() - started))
+    engine.stop()
+    return startup, results
+
+
+def render_pages(engine_name, paths, dist_dir, jobs, assets=None):
+    """Render `paths` with `jobs` worker processes; (startup times, results in `paths` order)."""
+    if jobs <= 1 or len(paths) <= 1:
+        startup, results = render_batch(engine_name, paths, dist_dir, assets)
+        return [startup], results
+
+    # Interleaved batches even out the cost of heavy modules; results are put
+    # back in page order, so the log and the manifest don't depend on timing.
+    jobs = min(jobs, len(paths))
+    batches = [paths[i::jobs] for i in range(jobs)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        done = list(pool.map(
+            render_batch,
+            [engine_name] * jobs,
+            batches,
+            [dist_dir] * jobs,
+            [assets] * jobs,
+            [f"{DB_PATH}.{i}" for i in range(jobs)],
+        ))
+    by_path = {result[0]: result for _, batch in done for result in batch}
+    return [startup for startup, _ in done], [by_path[path] for path in paths]
+
+
+def timing_report(results, wall, limit=10):
+    """Print the slowest pages and how much the workers overlapped."""
+    times = [seconds for _, out, seconds in results if out is not None]
+    if not times:
+        return
+    busy = sum(times)
+    print(f"  {len(times)} pages: {busy:.2f}s of rendering in {wall:.2f}s wall "
+          f"({busy / wall if wall else 0:.1f}x parallel), median {statistics.median(times) * 1000:.0f} ms")
+    print(f"  Slowest {min(limit, len(times))}:")
+    slowest = sorted((r for r in results if r[1] is not None), key=lambda r: r[2], reverse=True)
+    for path, _, seconds in slowest[:limit]:
+        print(f"  {seconds * 1000:>8.0f} ms  {path}")
+
+
+def start_server(db_path=DB_PATH):
     """Start the FastAPI app as a subprocess."""
     env = os.environ.copy()
-    env["COURSE_DIR"] = str(COURSE_DIR)
-    env["DB_PATH"] = DB_PATH
-    env["DATA_DIR"] = "/tmp"
+    env.update(export_env(db_path))
 
     return subprocess.Popen(
         [
@@ -115,33 +304,220 @@ def fetch_page(path):
 # Asset management
 # ---------------------------------------------------------------------------
 
+# Subdirectories of dist/static/ the exporter writes itself, not copied from app/static
+GENERATED_STATIC = ("vendor", "search")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def write_if_changed(path, body):
+    """Write bytes unless the file already holds them; True if it was written.
+    Unchanged files keep their mtime, so precompress() skips them too."""
+    if path.exists() and path.read_bytes() == body:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    return True
+
+
+def remove_output(path):
+    """Delete an output file with its precompressed siblings."""
+    for victim in (path, *(path.with_name(path.name + s) for s in COMPRESSED_SUFFIXES)):
+        if victim.exists():
+            victim.unlink()
+
+
 def copy_static_assets(repo_root, dist_dir):
-    """Copy app/static/ → dist/static/."""
+    """Sync app/static/ → dist/static/, copying only files that changed."""
     src = repo_root / "app" / "static"
     dst = dist_dir / "static"
+    wanted = set()
+    copied = removed = 0
+    for path in sorted(src.rglob("*")):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(src)
+        wanted.add(rel)
+        target = dst / rel
+        st = path.stat()
+        if target.exists():
+            tst = target.stat()
+            if (tst.st_size, tst.st_mtime_ns) == (st.st_size, st.st_mtime_ns):
+                continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, target)
+        copied += 1
+
     if dst.exists():
-        shutil.rmtree(dst)
-    shutil.copytree(src, dst)
-    print(f"  ✓ Copied app/static → dist/static/")
+        for path in sorted(dst.rglob("*")):
+            rel = path.relative_to(dst)
+            if not path.is_file() or rel.parts[0] in GENERATED_STATIC:
+                continue
+            if rel in wanted or (path.suffix in COMPRESSED_SUFFIXES and rel.with_suffix("") in wanted):
+                continue
+            path.unlink()
+            removed += 1
+    print(f"  ✓ Synced app/static → dist/static/ "
+          f"({copied} copied, {len(wanted) - copied} unchanged, {removed} removed)")
+
+
+def vendor_links():
+    """{CDN URL: /static/vendor/<file>} for the pinned assets in app/vendor.lock.json
+    (bundle_vendor_assets has put each of them in dist/ or stopped the export)."""
+    sys.path.insert(0, str(REPO_ROOT))
+    from app import vendor
+
+    return {
+        entry["url"]: f"/static/vendor/{entry['file']}"
+        for entry in vendor.load_lock().values() if entry.get("sha256")
+    }
 
 
-def download_cdn_assets(dist_dir):
-    """Download CDN assets into dist/static/vendor/ for offline use."""
-    vendor_dir = dist_dir / "static" / "vendor"
-    vendor_dir.mkdir(parents=True, exist_ok=True)
+def bundle_vendor_assets(dist_dir, require=False):
+    """Put every pinned vendor asset into dist/static/vendor/, checksum-verified.
+
+    Copies from the local store (app/static/vendor/, synced by
+    copy_static_assets) are used as they are. Until the store is filled,
+    missing files are downloaded from their pinned URL as before and checked
+    against the pinned sha256; rewrite_html() then points the CDN links at
+    them. A mismatched asset, or a pinned one that can't be downloaded (or
+    any missing one with `require`), stops the export instead of leaving
+    pages on the CDN. Assets not pinned yet only warn and stay on the CDN
+    until `scripts/vendor_assets.py --pin` has been run and committed.
+    """
+    sys.path.insert(0, str(REPO_ROOT))
+    from app import vendor
 
-    for asset in CDN_ASSETS:
-        dest = dist_dir / "static" / asset["local"]
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        if dest.exists():
-            print(f"  ✓ Cached: {asset['local']}")
+    vendor_dir = dist_dir / "static" / "vendor"
+    lock = vendor.load_lock()
+    bad = []
+    unpinned = 0
+    for name, entry in lock.items():
+        label = f"vendor/{entry['file']}"
+        dest = vendor_dir / entry["file"]
+        status = vendor.check(name)
+        if not entry.get("sha256") and not require:
+            print(f"  ! {label}: not pinned in vendor.lock.json — pages keep {entry['url']}")
+            unpinned += 1
             continue
-        print(f"  ↓ {asset['url']}")
-        try:
-            urllib.request.urlretrieve(asset["url"], str(dest))
-            print(f"    → {asset['local']}")
-        except Exception as e:
-            print(f"    ✗ FAILED: {e}")
+        if not entry.get("sha256"):
+            print(f"  ✗ {label}: not pinned in vendor.lock.json")
+        elif status == "ok":
+            print(f"  ✓ {label}")
+            continue
+        elif status == "mismatch":
+            print(f"  ✗ {label}: sha256 does not match vendor.lock.json")
+        elif require:
+            print(f"  ✗ {label}: not in the local store")
+        elif dest.exists() and vendor.file_sha256(dest) == entry["sha256"]:
+            print(f"  ✓ {label} (downloaded earlier)")
+            continue
+        else:
+            print(f"  ↓ {entry['url']}")
+            try:
+                with urllib.request.urlopen(entry["url"], timeout=30) as resp:
+                    body = resp.read()
+            except Exception as e:
+                print(f"  ✗ {label}: download failed: {e}")
+            else:
+                if hashlib.sha256(body).hexdigest() == entry["sha256"]:
+                    write_if_changed(dest, body)
+                    print(f"    → {label}")
+                    continue
+                print(f"  ✗ {label}: downloaded file does not match vendor.lock.json")
+        bad.append(name)
+
+    # Drop downloads of assets no longer in the lock
+    wanted = {entry["file"] for entry in lock.values()}
+    if vendor_dir.exists():
+        for path in sorted(vendor_dir.iterdir()):
+            if path.is_file() and path.suffix not in COMPRESSED_SUFFIXES and path.name not in wanted:
+                remove_output(path)
+
+    if bad:
+        print("  Pages must not fall back to the CDN. Run: python3 scripts/vendor_assets.py --pin")
+        sys.exit(1)
+    if unpinned:
+        print(f"  ! {unpinned} asset(s) still load from their CDN; pin and commit them with "
+              "python3 scripts/vendor_assets.py --pin")
+
+
+# ---------------------------------------------------------------------------
+# Asset fingerprinting
+#
+# Every file under dist/static/ except the search index (search.js builds
+# those names at runtime) is copied to dist/assets/ with a content hash in
+# its name — static/css/style.css → assets/css/style.<hash>.css — and
+# rewrite_html() points pages at the copies. Changed content means a new URL,
+# so /assets/ can be served as immutable; check_vercel_config() makes sure
+# vercel.json says so. The un-hashed originals stay in dist/static/.
+# ---------------------------------------------------------------------------
+
+ASSETS_DIR = "assets"
+ASSET_HASH_LENGTH = 10
+UNHASHED_STATIC = ("search",)
+IMMUTABLE_HEADERS = {
+    "source": f"/{ASSETS_DIR}/(.*)",
+    "headers": [{"key": "Cache-Control", "value": "public, max-age=31536000, immutable"}],
+}
+
+STATIC_REF = re.compile(r"""(?<=["'(])/static/[^"')?#\s]+""")
+
+
+def rewrite_asset_refs(text, assets):
+    """Point /static/... references that have a fingerprinted copy at it."""
+    return STATIC_REF.sub(lambda m: assets.get(m.group(0), m.group(0)), text)
+
+
+def fingerprint_assets(dist_dir):
+    """Write content-hashed copies of dist/static/ to dist/assets/.
+
+    Returns {"/static/css/style.css": "/assets/css/style.<hash>.css", ...}.
+    CSS is hashed last, after its url(/static/...) references are rewritten.
+    """
+    static_dir = dist_dir / "static"
+    out_dir = dist_dir / ASSETS_DIR
+    sources = [
+        path for path in sorted(static_dir.rglob("*"))
+        if path.is_file()
+        and path.suffix not in COMPRESSED_SUFFIXES
+        and path.relative_to(static_dir).parts[0] not in UNHASHED_STATIC
+    ]
+    assets = {}
+    written = set()
+    for path in sorted(sources, key=lambda p: p.suffix == ".css"):
+        rel = path.relative_to(static_dir)
+        body = path.read_bytes()
+        if path.suffix == ".css":
+            body = rewrite_asset_refs(body.decode("utf-8"), assets).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:ASSET_HASH_LENGTH]
+        hashed = rel.with_name(f"{rel.stem}.{digest}{rel.suffix}")
+        write_if_changed(out_dir / hashed, body)
+        written.add(out_dir / hashed)
+        assets[f"/static/{rel.as_posix()}"] = f"/{ASSETS_DIR}/{hashed.as_posix()}"
+
+    # Drop the copies of earlier versions
+    for path in sorted(out_dir.rglob("*"), reverse=True):
+        if path.is_file() and path not in written and path.with_suffix("") not in written:
+            path.unlink()
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+    print(f"  ✓ Fingerprinted {len(assets)} assets into dist/{ASSETS_DIR}/")
+    return assets
+
+
+def check_vercel_config(path=VERCEL_CONFIG):
+    """Fail unless vercel.json serves /assets/ with the immutable header rule.
+
+    The rule is committed with the config; the export only checks for it and
+    never edits source files.
+    """
+    rules = json.loads(path.read_text()).get("headers", [])
+    if IMMUTABLE_HEADERS in rules:
+        print(f"  ✓ {path.name} marks /{ASSETS_DIR}/ immutable")
+        return
+    print(f"  ✗ {path.name} has no immutable Cache-Control rule for /{ASSETS_DIR}/; add this to its \"headers\":")
+    print("    " + json.dumps(IMMUTABLE_HEADERS))
+    sys.exit(1)
 
 
 # ---------------------------------------------------------------------------
@@ -236,31 +612,26 @@ SIDEBAR_PROGRESS_JS = """
 </script>
 """
 
+# Search box wired to app/static/js/search.js (index written by write_search_index)
+STATIC_SEARCH_FORM = """<form class="nav-search" role="search" onsubmit="return false">
+                    <input type="search" placeholder="Search lessons…" aria-label="Search lessons" data-static-search autocomplete="off">
+                    <div class="search-dropdown" hidden></div>
+                </form>"""
+STATIC_SEARCH_JS = '<script src="/static/js/search.js" defer></script>\n'
 
-def rewrite_html(html):
+
+def rewrite_html(html, assets=None):
     """
     Post-process crawled HTML for static deployment:
-      1. Replace CDN URLs with local vendor paths
-      2. Remove server-only endpoints (/api/progress link)
+      1. Replace vendor CDN URLs with the copies in dist/static/vendor/
+      2. Remove server-only endpoints (/api/progress link); swap the /search
+         form for the client-side search box
       3. Replace HTMX progress toggle with localStorage version
       4. Inject sidebar progress JS
+      5. Point /static/ references at their fingerprinted copies in `assets`
     """
-    # --- CDN → local ---
-    cdn_map = {
-        "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/github-dark.min.css":
-            "/static/vendor/highlight.min.css",
-        "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js":
-            "/static/vendor/highlight.min.js",
-        "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/yaml.min.js":
-            "/static/vendor/highlight-yaml.min.js",
-        "https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/typescript.min.js":
-            "/static/vendor/highlight-typescript.min.js",
-        "https://cdn.jsdelivr.net/npm/mermaid@11/dist/mermaid.min.js":
-            "/static/vendor/mermaid.min.js",
-        "https://unpkg.com/htmx.org@2.0.4/dist/htmx.min.js":
-            "/static/vendor/htmx.min.js",
-    }
-    for cdn_url, local_path in cdn_map.items():
+    # --- CDN → local (pinned copies, bundled by bundle_vendor_assets) ---
+    for cdn_url, local_path in vendor_links().items():
         html = html.replace(cdn_url, local_path)
 
     # --- Remove server-only nav link ---
@@ -271,6 +642,16 @@ def rewrite_html(html):
         flags=re.DOTALL,
     )
 
+    # --- Server search form → client-side search over the prebuilt index ---
+    if '<form action="/search"' in html:
+        html = re.sub(
+            r'<form action="/search"[^>]*>.*?</form>',
+            STATIC_SEARCH_FORM,
+            html,
+            flags=re.DOTALL,
+        )
+        html = html.replace("</body>", STATIC_SEARCH_JS + "</body>", 1)
+
     # --- Replace HTMX progress toggle form with static placeholder ---
     # The server renders:
     #   <div id="progress-btn-wrap">
@@ -285,9 +666,95 @@ def rewrite_html(html):
         # Inject progress JS just before </body>
         html = html.replace("</body>", PROGRESS_JS + SIDEBAR_PROGRESS_JS + "</body>", 1)
 
+    # --- Fingerprinted assets (last: the steps above add /static/ references) ---
+    if assets:
+        html = rewrite_asset_refs(html, assets)
+
     return html
 
 
+# ---------------------------------------------------------------------------
+# Search index
+# ---------------------------------------------------------------------------
+
+def write_search_index(dist_dir):
+    """Write the sharded client-side search index to dist/static/search/."""
+    sys.path.insert(0, str(REPO_ROOT))
+    from app import content, search
+
+    content.COURSE_DIR = COURSE_DIR
+    content.reload_catalog()
+    out_dir = dist_dir / "static" / "search"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    sizes = {}
+    written = 0
+    for name, data in search.build_static_index().items():
+        body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        written += write_if_changed(out_dir / name, body)
+        sizes[name] = len(body)
+    for stale in out_dir.glob("*.json"):
+        if stale.name not in sizes:
+            remove_output(stale)
+
+    terms = [n for n in sizes if n.startswith("terms-")]
+    texts = [n for n in sizes if n.startswith("text-")]
+    print(f"  ✓ index.json {sizes['index.json'] / 1024:.1f} KB (fetched on first focus)")
+    print(f"  ✓ {len(terms)} term shards, {sum(sizes[n] for n in terms) / 1024:.0f} KB "
+          f"(largest {max((sizes[n] for n in terms), default=0) / 1024:.1f} KB)")
+    print(f"  ✓ {len(texts)} lesson texts for snippets, {sum(sizes[n] for n in texts) / 1024:.0f} KB")
+    print(f"  ✓ {written} of {len(sizes)} index files changed")
+
+
+# ---------------------------------------------------------------------------
+# Precompression
+# ---------------------------------------------------------------------------
+
+PRECOMPRESS_SUFFIXES = (".html", ".css", ".js", ".json", ".svg")
+
+
+def precompress(dist_dir):
+    """Write .gz (and .br, if brotli is installed) next to every text asset.
+
+    A sibling is stamped with its source's mtime, so files that haven't changed
+    since the last export keep the siblings they have.
+    """
+    sys.path.insert(0, str(REPO_ROOT))
+    from app.compression import compress, encodings
+
+    available = encodings()
+    totals = {}  # suffix -> [files, raw bytes, {encoding: bytes}]
+    written = 0
+    for path in sorted(dist_dir.rglob("*")):
+        if path.suffix not in PRECOMPRESS_SUFFIXES or path.name.startswith(".") or not path.is_file():
+            continue
+        st = path.stat()
+        body = None
+        row = totals.setdefault(path.suffix, [0, 0, dict.fromkeys(available, 0)])
+        row[0] += 1
+        row[1] += st.st_size
+        for encoding in available:
+            sibling = path.with_name(path.name + (".br" if encoding == "br" else ".gz"))
+            if not sibling.exists() or sibling.stat().st_mtime_ns != st.st_mtime_ns:
+                if body is None:
+                    body = path.read_bytes()
+                sibling.write_bytes(compress(body, encoding, best=True))
+                os.utime(sibling, ns=(st.st_atime_ns, st.st_mtime_ns))
+                written += 1
+            row[2][encoding] += sibling.stat().st_size
+
+    if "br" not in available:
+        print("  (brotli not installed — writing .gz only)")
+    print(f"  {written} compressed files written, the rest were up to date")
+    print(f"  {'type':<6} {'files':>5} {'raw KB':>9}" + "".join(f" {e + ' KB':>9} {'saved':>6}" for e in available))
+    for suffix, (files, raw, packed) in sorted(totals.items()):
+        line = f"  {suffix:<6} {files:>5} {raw / 1024:>9.1f}"
+        for encoding in available:
+            saved = 100 * (1 - packed[encoding] / raw) if raw else 0
+            line += f" {packed[encoding] / 1024:>9.1f} {saved:>5.0f}%"
+        print(line)
+
+
 # ---------------------------------------------------------------------------
 # Page discovery
 # ---------------------------------------------------------------------------
@@ -331,30 +798,184 @@ def get_all_pages(modules):
     return pages
 
 
+# ---------------------------------------------------------------------------
+# Incremental builds
+#
+# dist/.export-manifest.json records, for every exported page, a digest of
+# each input it was rendered from. The next run re-renders only pages whose
+# inputs changed or whose file is missing, and doesn't start the app at all
+# when none did. A page's inputs:
+#   site      templates, app code, this script and app/static — every page
+#   assets    the fingerprinted asset URLs pages link to — every page
+#   catalog   what the sidebar shows of each module — every page
+#   the page's own meta.yaml (lesson list, titles, so prev/next links); the
+#   index depends on every module's
+#   the lesson's markdown or the module's quiz file, for those pages
+# The search index is rebuilt only when some lesson page's inputs changed.
+# --clean ignores the manifest and rebuilds dist/ from scratch.
+# ---------------------------------------------------------------------------
+
+MANIFEST_FILE = ".export-manifest.json"
+MANIFEST_VERSION = 1
+
+_file_digests = {}
+
+
+def file_digest(path):
+    """sha256 of a file's bytes ("missing" if absent), memoised for this run."""
+    path = Path(path)
+    if path not in _file_digests:
+        try:
+            _file_digests[path] = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            _file_digests[path] = "missing"
+    return _file_digests[path]
+
+
+def input_name(path):
+    return os.path.relpath(path, REPO_ROOT)
+
+
+def site_digest():
+    """One digest over everything that shapes every page."""
+    files = [
+        *(APP_DIR / "templates").rglob("*.html"),
+        *APP_DIR.rglob("*.py"),
+        APP_DIR / "vendor.lock.json",
+        Path(__file__).resolve(),
+        *(p for p in (APP_DIR / "static").rglob("*") if p.is_file()),
+    ]
+    h = hashlib.sha256()
+    for path in sorted(files):
+        h.update(f"{input_name(path)}\0{file_digest(path)}\n".encode())
+    return h.hexdigest()
+
+
+def catalog_digest(modules):
+    summary = [
+        [m.get("id"), m.get("title"), m.get("icon"), m.get("order"), len(m.get("lessons", []))]
+        for m in modules
+    ]
+    return hashlib.sha256(json.dumps(summary, default=str).encode()).hexdigest()
+
+
+def page_inputs(modules, assets):
+    """{page path: {input: digest}} for every page get_all_pages() lists."""
+    shared = {
+        "site": site_digest(),
+        "assets": hashlib.sha256(json.dumps(assets, sort_keys=True).encode()).hexdigest(),
+        "catalog": catalog_digest(modules),
+    }
+    metas = [Path(m["_dir"]) / "meta.yaml" for m in modules]
+    pages = {"/": {**shared, **{input_name(p): file_digest(p) for p in metas}}}
+    for m, meta in zip(modules, metas):
+        mid = m["id"]
+        module_dir = Path(m["_dir"])
+        own = {**shared, input_name(meta): file_digest(meta)}
+        pages[f"/module/{mid}"] = own
+        for lesson in m.get("lessons", []):
+            source = module_dir / lesson["file"]
+            pages[f"/module/{mid}/lesson/{lesson['slug']}"] = {**own, input_name(source): file_digest(source)}
+        quiz = module_dir / m.get("quiz_file", "quiz.yaml")
+        pages[f"/module/{mid}/quiz"] = {**own, input_name(quiz): file_digest(quiz)}
+    return pages
+
+
+def search_digest(inputs):
+    """The search index covers every lesson page, so it depends on all their inputs."""
+    lessons = {path: inputs[path] for path in inputs if "/lesson/" in path}
+    return hashlib.sha256(json.dumps(lessons, sort_keys=True).encode()).hexdigest()
+
+
+def load_manifest(dist_dir):
+    """The last export's manifest; empty if there is none usable."""
+    try:
+        manifest = json.loads((dist_dir / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        manifest = {}
+    return {"pages": manifest.get("pages", {}), "search": manifest.get("search")}
+
+
+def save_manifest(dist_dir, pages, search):
+    body = json.dumps({"version": MANIFEST_VERSION, "pages": pages, "search": search}, indent=1, sort_keys=True)
+    (dist_dir / MANIFEST_FILE).write_text(body + "\n")
+
+
+def plan_pages(pages, inputs, previous, dist_dir):
+    """(pages to render, pages whose output can be kept, stale page paths to delete)."""
+    render, keep = [], []
+    for path in pages:
+        fresh = previous.get(path) == inputs[path] and page_file(path, dist_dir).exists()
+        (keep if fresh else render).append(path)
+    removed = [path for path in previous if path not in inputs]
+    return render, keep, removed
+
+
 # ---------------------------------------------------------------------------
 # File output
 # ---------------------------------------------------------------------------
 
-def save_page(path, html, dist_dir):
-    """Save a crawled page to dist/ with clean URL structure."""
+def page_file(path, dist_dir):
+    """dist/ file a page is exported to (clean URLs: /module/foo/index.html)."""
     if path == "/":
-        out_file = dist_dir / "index.html"
-    else:
-        clean = path.strip("/")
-        out_file = dist_dir / clean / "index.html"
+        return dist_dir / "index.html"
+    return dist_dir / path.strip("/") / "index.html"
+
 
-    out_file.parent.mkdir(parents=True, exist_ok=True)
-    out_file.write_text(html, encoding="utf-8")
+def save_page(path, html, dist_dir):
+    """Save a crawled page to dist/ with clean URL structure."""
+    out_file = page_file(path, dist_dir)
+    write_if_changed(out_file, html.encode("utf-8"))
     return out_file
 
 
+def remove_page(path, dist_dir):
+    """Delete a page that no longer exists, and any directories left empty."""
+    out_file = page_file(path, dist_dir)
+    remove_output(out_file)
+    parent = out_file.parent
+    while parent != dist_dir and parent.exists() and not any(parent.iterdir()):
+        parent.rmdir()
+        parent = parent.parent
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export the academy to a static dist/ directory.")
+    parser.add_argument(
+        "--engine", choices=sorted(ENGINES), default="inprocess",
+        help="how pages are rendered: in this process over ASGI (default) or by crawling a uvicorn server",
+    )
+    parser.add_argument(
+        "--clean", action="store_true",
+        help="delete dist/ and render every page instead of only those whose inputs changed",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1, metavar="N",
+        help="render pages on N worker processes (in-process engine only; default 1)",
+    )
+    parser.add_argument(
+        "--require-vendor", action="store_true",
+        help="fail unless every vendor asset is in the verified local store (fully offline pages)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.jobs > 1 and args.engine == "server":
+        parser.error("--jobs needs the in-process engine (one server can only use one port)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
     print("🦞 OpenClaw Academy — Static Export")
     print("=" * 52)
+    started = time.perf_counter()
 
     # Verify we're in the right place
     if not (REPO_ROOT / "app" / "main.py").exists():
@@ -363,16 +984,21 @@ def main():
         sys.exit(1)
 
     # Step 1: Clean dist directory
-    print("\n[1/6] Cleaning dist/...")
-    if DIST_DIR.exists():
-        shutil.rmtree(DIST_DIR)
-    DIST_DIR.mkdir(parents=True)
-    print(f"  ✓ Ready: {DIST_DIR}")
+    if args.clean or not DIST_DIR.exists():
+        print("\n[1/7] Cleaning dist/...")
+        if DIST_DIR.exists():
+            shutil.rmtree(DIST_DIR)
+        DIST_DIR.mkdir(parents=True)
+        print(f"  ✓ Ready: {DIST_DIR}")
+    else:
+        print("\n[1/7] Reusing dist/ (incremental; --clean rebuilds it)...")
+        print(f"  ✓ Ready: {DIST_DIR}")
 
     # Step 2: Check dependencies
-    print("\n[2/6] Checking dependencies...")
+    print("\n[2/7] Checking dependencies...")
     missing = []
-    for pkg in ("uvicorn", "fastapi", "mistune", "yaml", "aiosqlite"):
+    needed = ("fastapi", "mistune", "yaml", "aiosqlite") + (("uvicorn",) if args.engine == "server" else ())
+    for pkg in needed:
         real_pkg = "PyYAML" if pkg == "yaml" else pkg
         try:
             __import__(pkg)
@@ -385,54 +1011,73 @@ def main():
     print("  ✓ All dependencies available")
 
     # Step 3: Copy & download assets
-    print("\n[3/6] Bundling static assets...")
+    print("\n[3/7] Bundling static assets...")
     copy_static_assets(REPO_ROOT, DIST_DIR)
-    download_cdn_assets(DIST_DIR)
+    bundle_vendor_assets(DIST_DIR, require=args.require_vendor)
+    assets = fingerprint_assets(DIST_DIR)
+    check_vercel_config()
 
-    # Step 4: Start server
-    print("\n[4/6] Starting FastAPI server...")
-    if Path(DB_PATH).exists():
-        Path(DB_PATH).unlink()
+    # Work out which pages need rendering
+    modules = load_course_modules()
+    pages = get_all_pages(modules)
+    inputs = page_inputs(modules, assets)
+    previous = load_manifest(DIST_DIR)  # empty after --clean
+    to_render, kept, removed = plan_pages(pages, inputs, previous["pages"], DIST_DIR)
+    for path in removed:
+        remove_page(path, DIST_DIR)
+
+    # Step 4: Search index
+    print("\n[4/7] Building search index...")
+    search = search_digest(inputs)
+    if search == previous["search"] and (DIST_DIR / "static" / "search" / "index.json").exists():
+        print("  ✓ Up to date — no lesson changed")
+    else:
+        write_search_index(DIST_DIR)
 
-    proc = start_server()
-    print(f"  Server PID {proc.pid} on port {PORT}...")
+    # Step 5: Render pages
+    engine_name = ENGINES[args.engine].name
+    print(f"\n[5/7] Rendering pages ({engine_name}, {args.jobs} job{'s' if args.jobs > 1 else ''})...")
+    print(f"  Found {len(pages)} pages ({len(modules)} modules): "
+          f"{len(to_render)} to render, {len(kept)} unchanged, {len(removed)} removed")
 
-    if not wait_for_server():
-        print("  ✗ Server failed to start within 30 seconds")
-        proc.terminate()
+    render_started = time.perf_counter()
+    if to_render:
+        startups, results = render_pages(args.engine, to_render, DIST_DIR, args.jobs, assets)
+    else:
+        startups, results = [], []
+        print("  ✓ App not started — every page is up to date")
+    wall = time.perf_counter() - render_started
+    if startups and all(startup is None for startup in startups):
+        print("  ✗ App failed to start")
         sys.exit(1)
-    print("  ✓ Server ready")
-
-    # Step 5: Crawl pages
-    print("\n[5/6] Crawling pages...")
-    modules = load_course_modules()
-    pages = get_all_pages(modules)
-    print(f"  Found {len(pages)} pages ({len(modules)} modules)")
+    if startups:
+        print(f"  ✓ App started in {max(s for s in startups if s is not None):.2f}s"
+              + (f" (slowest of {len(startups)} workers)" if len(startups) > 1 else ""))
 
     crawled = 0
     failed = []
-
-    for path in pages:
-        print(f"  {path}", end=" ", flush=True)
-        html = fetch_page(path)
-        if html is None:
+    rendered = {path: previous["pages"][path] for path in kept}
+    for path, out, seconds in results:
+        if out is None:
             failed.append(path)
-            print("✗ FAILED")
+            print(f"  {path} ✗ FAILED")
             continue
-        html = rewrite_html(html)
-        out = save_page(path, html, DIST_DIR)
         crawled += 1
-        rel = out.relative_to(DIST_DIR)
-        print(f"→ {rel}")
+        rendered[path] = inputs[path]
+        print(f"  {path} → {out.relative_to(DIST_DIR)} ({seconds * 1000:.0f} ms)")
+    print(f"  ✓ {crawled} pages in {wall:.2f}s")
+    save_manifest(DIST_DIR, rendered, search)
+
+    # Step 6: Timing report
+    print("\n[6/7] Page timings...")
+    if results:
+        timing_report(results, wall)
+    else:
+        print("  (nothing rendered)")
 
-    # Step 6: Shutdown server
-    print("\n[6/6] Shutting down server...")
-    proc.terminate()
-    try:
-        proc.wait(timeout=5)
-    except subprocess.TimeoutExpired:
-        proc.kill()
-    print("  ✓ Server stopped")
+    # Step 7: Precompress
+    print("\n[7/7] Precompressing...")
+    precompress(DIST_DIR)
 
     # Summary
     print("\n" + "=" * 52)
@@ -442,7 +1087,8 @@ def main():
             print(f"   ✗ {p}")
         status = 1
     else:
-        print(f"✅ Export complete! {crawled} pages exported.")
+        print(f"✅ Export complete in {time.perf_counter() - started:.1f}s: "
+              f"{crawled} pages rebuilt, {len(kept)} skipped, {len(removed)} removed.")
         status = 0
 
     print(f"\n   Output:  {DIST_DIR}/")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+OpenClaw Academy — Vendor Store
+
+Fills app/static/vendor/ with the browser libraries pinned in
+app/vendor.lock.json (highlight.js, mermaid, htmx) and verifies every file
+against its sha256. Commit the files and neither the app nor
+scripts/export_static.py needs the network for them again.
+
+Usage:
+    python3 scripts/vendor_assets.py           # download what's missing, verify everything
+    python3 scripts/vendor_assets.py --check   # verify only, no network
+    python3 scripts/vendor_assets.py --pin     # also record the sha256 of unpinned entries
+                                               # (first run, or after changing a URL)
+"""
+import argparse
+import hashlib
+import json
+import sys
+import urllib.request
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from app import vendor  # noqa: E402
+
+
+def download(url):
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        return resp.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download and verify the pinned vendor assets.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="verify the store without downloading")
+    mode.add_argument("--pin", action="store_true", help="record sha256 for entries that have none")
+    args = parser.parse_args()
+
+    lock = vendor.load_lock()
+    vendor.VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    errors = 0
+    pinned = 0
+
+    for name, entry in lock.items():
+        path = vendor.VENDOR_DIR / entry["file"]
+        if path.is_file():
+            body, source = path.read_bytes(), "local"
+        elif args.check:
+            print(f"  ✗ {entry['file']}: missing")
+            errors += 1
+            continue
+        else:
+            try:
+                body, source = download(entry["url"]), "downloaded"
+            except Exception as e:
+                print(f"  ✗ {entry['file']}: download failed: {e}")
+                errors += 1
+                continue
+
+        digest = hashlib.sha256(body).hexdigest()
+        if not entry.get("sha256"):
+            if not args.pin:
+                print(f"  ✗ {entry['file']}: not pinned in {vendor.LOCK_FILE.name} (run with --pin)")
+                errors += 1
+                continue
+            entry["sha256"] = digest
+            pinned += 1
+        elif digest != entry["sha256"]:
+            print(f"  ✗ {entry['file']}: sha256 {digest[:12]}… does not match the pinned {entry['sha256'][:12]}…")
+            errors += 1
+            continue
+
+        if source == "downloaded":
+            path.write_bytes(body)
+        print(f"  ✓ {entry['file']} ({source}, {len(body) / 1024:.0f} KB)")
+
+    if pinned:
+        vendor.LOCK_FILE.write_text(json.dumps(lock, indent=2) + "\n")
+        print(f"  ✓ Pinned {pinned} asset(s) in {vendor.LOCK_FILE.name}")
+
+    if errors:
+        print(f"\n✗ {errors} asset(s) not verified")
+        sys.exit(1)
+    print(f"\n✅ {len(lock)} assets verified in {vendor.VENDOR_DIR.relative_to(REPO_ROOT)}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+OpenClaw Academy — content layer unit tests (no browser or server needed).
+"""
+
+import os
+
+import pytest
+
+from app import content
+
+
+def _write_module(root, name, order, lessons=("intro",)):
+    module_dir = root / name
+    module_dir.mkdir(parents=True, exist_ok=True)
+    lines = [f"id: {name}", f"title: \"{name.title()}\"", f"order: {order}", "lessons:"]
+    for i, slug in enumerate(lessons, 1):
+        lines += [f"  - slug: {slug}", f"    title: \"{slug.title()}\"", f"    file: {i:02d}-{slug}.md"]
+        (module_dir / f"{i:02d}-{slug}.md").write_text(f"# {slug}\n\nBody of {slug}.\n")
+    (module_dir / "meta.yaml").write_text("\n".join(lines) + "\n")
+    return module_dir
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def course(tmp_path, monkeypatch):
+    root = tmp_path / "course"
+    _write_module(root, "module-a", 2)
+    _write_module(root, "module-b", 1)
+    monkeypatch.setattr(content, "COURSE_DIR", root)
+    content.reload_catalog()
+    return root
+
+
+# ===========================================================================
+# Catalog
+# ===========================================================================
+
+class TestCatalog:
+
+    def test_modules_sorted_by_order(self, course):
+        assert [m["id"] for m in content.load_modules()] == ["module-b", "module-a"]
+
+    def test_unchanged_tree_is_not_reparsed(self, course, monkeypatch):
+        content.load_modules()
+        calls = []
+        real = content.yaml.safe_load
+        monkeypatch.setattr(content.yaml, "safe_load", lambda s: calls.append(s) or real(s))
+        content.load_modules()
+        content.load_module("module-a")
+        assert calls == []
+
+    def test_only_changed_meta_is_reparsed(self, course, monkeypatch):
+        content.load_modules()
+        meta = course / "module-a" / "meta.yaml"
+        meta.write_text(meta.read_text().replace('"Module-A"', '"Renamed"'))
+        _bump_mtime(meta)
+
+        calls = []
+        real = content.yaml.safe_load
+        monkeypatch.setattr(content.yaml, "safe_load", lambda s: calls.append(s) or real(s))
+        assert content.load_module("module-a")["title"] == "Renamed"
+        assert len(calls) == 1
+
+    def test_added_and_removed_modules_are_picked_up(self, course):
+        _write_module(course, "module-c", 3)
+        _bump_mtime(course)
+        assert [m["id"] for m in content.load_modules()] == ["module-b", "module-a", "module-c"]
+
+        (course / "module-c" / "meta.yaml").unlink()
+        assert content.load_module("module-c") is None
+
+    def test_returned_modules_are_copies(self, course):
+        module = content.load_module("module-a")
+        module["lessons"][0]["completed"] = 1
+        module["progress_done"] = 1
+        fresh = content.load_module("module-a")
+        assert "completed" not in fresh["lessons"][0]
+        assert "progress_done" not in fresh
+
+    def test_reload_disabled_waits_for_explicit_signal(self, course, monkeypatch):
+        monkeypatch.setattr(content, "CONTENT_RELOAD", False)
+        content.load_modules()
+        meta = course / "module-a" / "meta.yaml"
+        meta.write_text(meta.read_text().replace('"Module-A"', '"Renamed"'))
+        _bump_mtime(meta)
+
+        assert content.load_module("module-a")["title"] == "Module-A"
+        content.reload_catalog()
+        assert content.load_module("module-a")["title"] == "Renamed"
+
+
+# ===========================================================================
+# Markdown pipeline
+# ===========================================================================
+
+class TestRenderMarkdown:
+
+    def test_mermaid_fence_with_blank_lines(self):
+        html = content.render_markdown("```mermaid\ngraph TD\n\n    A --> B\n```\n")
+        assert html == '<div class="mermaid">\ngraph TD\n\n    A --> B\n</div>\n'
+
+    def test_other_fences_are_code_blocks(self):
+        html = content.render_markdown("```yaml\na: 1\n```\n")
+        assert html.startswith("<pre><code class=")
+        assert "language-yaml" in html.split(">", 2)[1]
+
+    def test_code_fences_are_highlighted_server_side(self, monkeypatch):
+        monkeypatch.setattr(content.highlight, "SERVER_HIGHLIGHT", True)
+        html = content.render_markdown("```yaml\nkey: \"<v>\"  # note\n```\n")
+        assert html.startswith('<pre><code class="hljs language-yaml">')
+        assert '<span class="hljs-attr">key</span>' in html
+        assert '<span class="hljs-string">"&lt;v&gt;"</span>' in html
+        assert '<span class="hljs-comment"># note' in html
+
+    def test_unknown_language_is_escaped_plain_text(self, monkeypatch):
+        monkeypatch.setattr(content.highlight, "SERVER_HIGHLIGHT", True)
+        html = content.render_markdown("```nosuchlang\n<b>&\n```\n")
+        assert html == '<pre><code class="hljs language-nosuchlang">&lt;b&gt;&amp;\n</code></pre>\n'
+
+    def test_highlighting_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(content.highlight, "SERVER_HIGHLIGHT", False)
+        html = content.render_markdown("```yaml\nkey: v\n```\n")
+        assert html == '<pre><code class="language-yaml">key: v\n</code></pre>\n'
+
+    @pytest.mark.parametrize("marker,kind", [
+        ("Note:", "note"), ("Warning:", "warning"), ("Exercise:", "exercise"),
+        ("Tip:", "tip"), ("💡", "tip"),
+    ])
+    def test_callout_kinds(self, marker, kind):
+        html = content.render_markdown(f"> **{marker}** something\n")
+        assert html.startswith(f'<blockquote class="callout callout-{kind}">')
+
+    def test_plain_blockquote(self):
+        assert content.render_markdown("> quoted\n").startswith('<blockquote class="callout">')
+
+    def test_nested_blockquotes_are_classified_independently(self):
+        html = content.render_markdown("> **Warning:** outer\n>\n> > **Tip:** inner\n")
+        assert html.count("<blockquote") == 2
+        assert html.count("</blockquote>") == 2
+        assert html.startswith('<blockquote class="callout callout-warning">')
+        assert '<blockquote class="callout callout-tip">' in html
+
+
+# ===========================================================================
+# Render cache
+# ===========================================================================
+
+class TestRenderCache:
+
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self):
+        content.clear_render_cache()
+        yield
+        content.clear_render_cache()
+
+    def test_warm_view_skips_rendering(self, course, monkeypatch):
+        first = content.load_lesson("module-a", "intro")["content_html"]
+
+        def boom(text):
+            raise AssertionError("render_markdown called on a warm view")
+
+        monkeypatch.setattr(content, "render_markdown", boom)
+        assert content.load_lesson("module-a", "intro")["content_html"] == first
+        assert content.render_cache_stats()["hits"] == 1
+        assert content.render_cache_stats()["misses"] == 1
+
+    def test_edited_lesson_misses(self, course):
+        content.load_lesson("module-a", "intro")
+        (course / "module-a" / "01-intro.md").write_text("# Changed\n")
+        html = content.load_lesson("module-a", "intro")["content_html"]
+        assert "Changed" in html
+        assert content.render_cache_stats()["misses"] == 2
+
+    def test_renderer_version_is_part_of_key(self, course, monkeypatch):
+        content.render_markdown_cached("# Same\n")
+        monkeypatch.setattr(content, "RENDERER_VERSION", "test")
+        content.render_markdown_cached("# Same\n")
+        assert content.render_cache_stats()["misses"] == 2
+
+    def test_lru_eviction(self, monkeypatch):
+        monkeypatch.setattr(content, "RENDER_CACHE_SIZE", 2)
+        for text in ("a", "b", "a", "c"):
+            content.render_markdown_cached(text)
+        stats = content.render_cache_stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+        content.render_markdown_cached("a")  # most recently used survived
+        assert content.render_cache_stats()["hits"] == 2
+
+
+class TestRenderCacheDir:
+
+    @pytest.fixture(autouse=True)
+    def _cache_dir(self, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "render-cache"
+        monkeypatch.setattr(content, "RENDER_CACHE_DIR", str(cache_dir))
+        content.clear_render_cache()
+        yield cache_dir
+        content.clear_render_cache()
+
+    def test_restart_is_warm(self, course, _cache_dir, monkeypatch):
+        first = content.load_lesson("module-a", "intro")["content_html"]
+        assert len(list(_cache_dir.glob("*.html"))) == 1
+
+        content.clear_render_cache()  # simulate a fresh process
+        monkeypatch.setattr(content, "render_markdown", lambda text: pytest.fail("re-rendered"))
+        assert content.load_lesson("module-a", "intro")["content_html"] == first
+        assert content.render_cache_stats()["disk_hits"] == 1
+
+    def test_no_partial_files_left_behind(self, course, _cache_dir):
+        content.load_lesson("module-a", "intro")
+        assert [p.name for p in _cache_dir.iterdir() if p.name.startswith(".tmp-")] == []
+
+    def test_prune_removes_orphans_and_old_versions(self, course, _cache_dir):
+        content.load_lesson("module-a", "intro")
+        content.render_markdown_cached("# no longer in the course\n")
+        (_cache_dir / ("vold-" + "0" * 64 + ".html")).write_text("<p>old renderer</p>")
+
+        report = content.prune_render_cache_dir()
+        assert report["removed"] == 2
+        assert report["kept"] == 1
+
+    def test_prune_enforces_size_cap(self, course, _cache_dir):
+        content.load_lesson("module-a", "intro")
+        content.load_lesson("module-b", "intro")
+        report = content.prune_render_cache_dir(max_bytes=1)
+        assert report["kept"] == 0
+        assert report["bytes_after"] == 0
+
+
+# ===========================================================================
+# Course bundle
+# ===========================================================================
+
+class TestCourseBundle:
+
+    @pytest.fixture
+    def bundle_path(self, course, tmp_path):
+        (course / "module-a" / "quiz.yaml").write_text("id: qa\ntitle: Quiz A\nquestions: []\n")
+        path = tmp_path / "bundle.json"
+        content.write_course_bundle(path)
+        yield path
+        content.unload_course_bundle()
+
+    def test_bundle_serves_same_content(self, course, bundle_path, monkeypatch):
+        from_dir = content.load_lesson("module-a", "intro")
+        content.load_course_bundle(bundle_path)
+        monkeypatch.setattr(content, "COURSE_DIR", course.parent / "missing")
+
+        assert [m["id"] for m in content.load_modules()] == ["module-b", "module-a"]
+        assert content.load_lesson("module-a", "intro") == from_dir
+        assert content.load_quiz("module-a")["id"] == "qa"
+        assert content.load_quiz("module-b") is None
+        assert content.load_lesson("module-a", "nope") is None
+
+    def test_bundle_format_is_checked(self, bundle_path):
+        bundle_path.write_text(bundle_path.read_text().replace('"format":1', '"format":999'))
+        with pytest.raises(ValueError, match="format"):
+            content.load_course_bundle(bundle_path)
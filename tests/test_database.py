@@ -0,0 +1,410 @@
+"""
+OpenClaw Academy — progress database unit tests (no browser or server needed).
+"""
+
+import asyncio
+
+import pytest
+
+from app import database
+
+U = database.DEFAULT_LEARNER
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "progress.db"
+    monkeypatch.setattr(database, "DB_PATH", str(path))
+    asyncio.run(database.init_db())
+    return path
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _with_pool(fn, size=2):
+    await database.open_pool(size)
+    try:
+        return await fn()
+    finally:
+        await database.close_pool()
+
+
+# ===========================================================================
+# Connection pool
+# ===========================================================================
+
+class TestPool:
+
+    def test_connections_use_wal_and_tuned_pragmas(self, db_path):
+        async def check():
+            async with database._read() as db:
+                journal = (await db.execute_fetchall("PRAGMA journal_mode"))[0][0]
+                sync = (await db.execute_fetchall("PRAGMA synchronous"))[0][0]
+                cache = (await db.execute_fetchall("PRAGMA cache_size"))[0][0]
+            return journal, sync, cache
+
+        journal, sync, cache = run(_with_pool(check))
+        assert journal == "wal"
+        assert sync == 1  # NORMAL
+        assert cache == -database.DB_CACHE_KB
+
+    def test_pooled_connections_are_reused(self, db_path):
+        async def check():
+            seen = set()
+            for _ in range(10):
+                async with database._read() as db:
+                    seen.add(id(db))
+            return seen
+
+        assert len(run(_with_pool(check, size=2))) <= 2
+
+    def test_reads_run_alongside_writes(self, db_path):
+        async def check():
+            await asyncio.gather(*(
+                database.mark_lesson_complete(U, f"m::l{i}", "m", f"l{i}") for i in range(20)
+            ), *(database.get_progress(U) for _ in range(20)))
+            return await database.get_progress(U)
+
+        progress = run(_with_pool(check))
+        assert len(progress) == 20
+
+    def test_failed_write_is_rolled_back(self, db_path):
+        async def check():
+            with pytest.raises(RuntimeError):
+                async with database._write() as db:
+                    await db.execute(
+                        "INSERT INTO lesson_progress (user_id, lesson_id, module_id, lesson_slug) "
+                        "VALUES ('local', 'x', 'm', 'x')"
+                    )
+                    raise RuntimeError("boom")
+            return await database.get_progress(U)
+
+        assert run(_with_pool(check)) == {}
+
+    def test_helpers_work_without_pool(self, db_path):
+        run(database.mark_lesson_complete(U, "m::a", "m", "a"))
+        run(database.save_quiz_attempt(U, "q", 3, 5, {"q1": "a"}))
+        assert run(database.get_progress(U))["m::a"]["completed"] == 1
+        assert run(database.get_quiz_best(U, "q"))["score"] == 3
+
+
+# ===========================================================================
+# Progress queries
+# ===========================================================================
+
+class TestProgressQueries:
+
+    def test_completed_counts_per_module(self, db_path):
+        run(database.mark_lesson_complete(U, "a::1", "a", "1"))
+        run(database.mark_lesson_complete(U, "a::2", "a", "2"))
+        run(database.mark_lesson_complete(U, "b::1", "b", "1"))
+        run(database.mark_lesson_incomplete(U, "b::1", "b", "1"))
+        run(database.mark_lesson_complete(U, "c::1", "c", "1"))
+        assert run(database.get_completed_counts(U)) == {"a": 2, "c": 1}
+
+    def test_completed_counts_skip_stale_lessons(self, db_path):
+        run(database.mark_lesson_complete(U, "a::1", "a", "1"))
+        run(database.mark_lesson_complete(U, "a::renamed", "a", "renamed"))
+        run(database.mark_lesson_complete(U, "gone::1", "gone", "1"))
+        assert run(database.get_completed_counts(U, {"a::1", "a::2"})) == {"a": 1}
+
+        async def cached():
+            await database.load_progress_cache()
+            return await database.get_completed_counts(U, {"a::1", "a::2"})
+
+        assert run(_with_pool(cached)) == {"a": 1}
+
+    def test_completed_counts_use_covering_index(self, db_path):
+        import sqlite3
+        plan = sqlite3.connect(db_path).execute(
+            "EXPLAIN QUERY PLAN SELECT module_id, COUNT(*) FROM lesson_progress "
+            "WHERE user_id = ? AND completed = 1 AND lesson_id IN (SELECT value FROM json_each(?)) "
+            "GROUP BY module_id", ("u", "[]")
+        ).fetchall()
+        assert "COVERING INDEX idx_progress_user_completed_module" in plan[0][-1]
+
+    def test_learners_are_isolated(self, db_path):
+        run(database.mark_lesson_complete("alice", "a::1", "a", "1"))
+        run(database.save_quiz_attempt("alice", "q", 5, 5, {}))
+        run(database.mark_lesson_complete("bob", "a::2", "a", "2"))
+        assert list(run(database.get_progress("alice"))) == ["a::1"]
+        assert list(run(database.get_progress("bob"))) == ["a::2"]
+        assert run(database.get_quiz_best("bob", "q")) is None
+
+
+class TestMigration:
+
+    def test_single_user_database_is_migrated(self, tmp_path, monkeypatch):
+        import sqlite3
+        path = tmp_path / "old.db"
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE lessons (id TEXT PRIMARY KEY, module_id TEXT NOT NULL,
+                lesson_slug TEXT NOT NULL, completed INTEGER DEFAULT 0,
+                completed_at TEXT, notes TEXT);
+            CREATE TABLE quiz_attempts (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                quiz_id TEXT NOT NULL, score INTEGER NOT NULL, total INTEGER NOT NULL,
+                answers_json TEXT NOT NULL, attempted_at TEXT NOT NULL);
+            INSERT INTO lessons VALUES ('a::1', 'a', '1', 1, '2024-01-01', NULL);
+            INSERT INTO quiz_attempts VALUES (NULL, 'q', 3, 5, '{"q1": "a"}', '2024-01-01');
+            INSERT INTO quiz_attempts VALUES (NULL, 'q', 4, 5, '{}', '2024-01-02');
+            INSERT INTO quiz_attempts VALUES (NULL, 'q', 2, 5, '{}', '2024-01-03');
+        """)
+        conn.close()
+        monkeypatch.setattr(database, "DB_PATH", str(path))
+
+        run(database.init_db())
+        run(database.init_db())  # idempotent
+        assert run(database.get_completed_counts(U)) == {"a": 1}
+        best = run(database.get_quiz_best(U, "q"))
+        assert (best["id"], best["score"], best["attempted_at"]) == (2, 4, "2024-01-02")
+        conn = sqlite3.connect(path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'lessons'").fetchone() is None
+        assert conn.execute("SELECT answers_json FROM quiz_attempts WHERE id = 1").fetchone()[0] == '{"q1":"a"}'
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+
+
+# ===========================================================================
+# Best quiz scores
+# ===========================================================================
+
+class TestQuizBest:
+
+    def test_best_attempt_is_kept(self, db_path):
+        for score in (3, 5, 4):
+            run(database.save_quiz_attempt(U, "q", score, 5, {"score": score}))
+        best = run(database.get_quiz_best(U, "q"))
+        assert best["score"] == 5
+        assert best["answers_json"] == '{"score":5}'
+        assert best["id"] == 2
+
+    def test_tie_goes_to_newest_attempt(self, db_path):
+        run(database.save_quiz_attempt(U, "q", 4, 5, {"try": 1}))
+        run(database.save_quiz_attempt(U, "q", 4, 5, {"try": 2}))
+        assert run(database.get_quiz_best(U, "q"))["answers_json"] == '{"try":2}'
+
+    def test_answers_are_stored_compactly(self, db_path):
+        run(database.save_quiz_attempt(U, "q", 1, 3, {"q1": "a", "q2": "", "q3": "é"}))
+        assert run(database.get_quiz_best(U, "q"))["answers_json"] == '{"q1":"a","q3":"é"}'
+
+    def test_best_is_a_key_lookup(self, db_path):
+        import sqlite3
+        plan = sqlite3.connect(db_path).execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM quiz_best WHERE user_id = ? AND quiz_id = ?", ("u", "q")
+        ).fetchall()
+        assert "PRIMARY KEY" in plan[0][-1]
+
+
+class TestMaintenance:
+
+    def test_history_is_pruned_but_best_is_kept(self, db_path):
+        for score in (5, 1, 2, 3, 4):
+            run(database.save_quiz_attempt(U, "q", score, 5, {}))
+        run(database.save_quiz_attempt("other", "q", 1, 5, {}))
+
+        report = run(database.run_maintenance(keep=2))
+        assert report["pruned"] == 2
+
+        import sqlite3
+        scores = [r[0] for r in sqlite3.connect(db_path).execute(
+            "SELECT score FROM quiz_attempts WHERE user_id = ? ORDER BY id", (U,)
+        )]
+        assert scores == [5, 3, 4]
+        assert run(database.get_quiz_best(U, "q"))["score"] == 5
+        assert run(database.get_quiz_best("other", "q"))["score"] == 1
+
+    def test_free_pages_are_returned(self, db_path):
+        for i in range(300):
+            run(database.save_quiz_attempt(U, "q", 0, 5, {"q": "x" * 500}))
+        report = run(database.run_maintenance(keep=1))
+        assert report["pruned"] == 299
+        assert report["bytes_after"] < report["bytes_before"]
+
+
+# ===========================================================================
+# Progress cache
+# ===========================================================================
+
+class TestProgressCache:
+
+    def test_write_through_and_version(self, db_path):
+        async def check():
+            await database.load_progress_cache()
+            v0 = database.progress_version(U)
+            await database.mark_lesson_complete(U, "a::1", "a", "1")
+            assert database.progress_version(U) > v0
+            assert (await database.get_module_progress(U, "a"))["a::1"]["completed"] == 1
+            assert await database.get_completed_counts(U) == {"a": 1}
+
+            v1 = database.progress_version(U)
+            await database.mark_lesson_incomplete(U, "a::1", "a", "1")
+            assert database.progress_version(U) > v1
+            assert await database.get_completed_counts(U) == {}
+
+            # the cache must agree with what was committed
+            cached = await database.get_progress(U)
+            database.drop_progress_cache()
+            assert await database.get_progress(U) == cached
+
+        run(_with_pool(check))
+
+    def test_cache_loaded_from_existing_rows(self, db_path):
+        run(database.mark_lesson_complete(U, "a::1", "a", "1"))
+        run(database.mark_lesson_complete(U, "b::1", "b", "1"))
+
+        async def check():
+            await database.load_progress_cache()
+            return await database.get_completed_counts(U)
+
+        assert run(_with_pool(check)) == {"a": 1, "b": 1}
+
+    def test_cache_keeps_recent_learners(self, db_path, monkeypatch):
+        monkeypatch.setattr(database, "PROGRESS_CACHE_USERS", 2)
+
+        async def check():
+            await database.load_progress_cache()
+            for user in ("a", "b", "c", "a"):
+                await database.mark_lesson_complete(user, "m::1", "m", "1")
+                await database.get_completed_counts(user)
+            return list(database._progress)
+
+        assert run(_with_pool(check)) == ["c", "a"]
+
+    def test_versions_are_bounded(self, db_path, monkeypatch):
+        monkeypatch.setattr(database, "PROGRESS_CACHE_USERS", 2)
+
+        async def check():
+            await database.load_progress_cache()
+            versions = {}
+            for user in ("a", "b", "c"):
+                await database.mark_lesson_complete(user, "m::1", "m", "1")
+                versions[user] = database.progress_version(user)
+            return versions
+
+        versions = run(_with_pool(check))
+        assert list(database._versions) == ["b", "c"]
+        # a dropped learner's version must not go back to one an ETag was built from
+        assert database.progress_version("a") >= versions["a"]
+
+    def test_cache_can_be_disabled(self, db_path, monkeypatch):
+        monkeypatch.setattr(database, "PROGRESS_CACHE", False)
+
+        async def check():
+            await database.load_progress_cache()
+            return database._progress
+
+        assert run(_with_pool(check)) is None
+
+
+# ===========================================================================
+# Write-behind queue
+# ===========================================================================
+
+class TestWriteBehind:
+
+    @pytest.fixture(autouse=True)
+    def _write_behind(self, monkeypatch):
+        monkeypatch.setattr(database, "DB_WRITE_BEHIND", True)
+        monkeypatch.setattr(database, "DB_BATCH_WINDOW_MS", 20)
+
+    def _count_commits(self, monkeypatch):
+        commits = []
+        real = database._execute_batch
+
+        async def counting(batch):
+            commits.append(len(batch))
+            return await real(batch)
+
+        monkeypatch.setattr(database, "_execute_batch", counting)
+        return commits
+
+    def test_burst_is_committed_in_batches(self, db_path, monkeypatch):
+        commits = self._count_commits(monkeypatch)
+
+        async def check():
+            await asyncio.gather(*(
+                database.mark_lesson_complete(U, f"m::l{i}", "m", f"l{i}") for i in range(50)
+            ))
+            return await database.get_completed_counts(U)
+
+        assert run(_with_pool(check)) == {"m": 50}
+        assert sum(commits) == 50
+        assert len(commits) < 10
+
+    def test_enqueue_durability_flushes_on_shutdown(self, db_path, monkeypatch):
+        monkeypatch.setattr(database, "DB_WRITE_DURABILITY", "enqueue")
+        monkeypatch.setattr(database, "DB_BATCH_WINDOW_MS", 1000)
+
+        async def check():
+            for i in range(5):
+                await database.mark_lesson_complete(U, f"m::l{i}", "m", f"l{i}")
+            await database.save_quiz_attempt(U, "q", 4, 5, {})
+
+        run(_with_pool(check))
+        assert len(run(database.get_progress(U))) == 5
+        assert run(database.get_quiz_best(U, "q"))["score"] == 4
+
+    def test_quiz_best_reads_its_own_write(self, db_path, monkeypatch):
+        monkeypatch.setattr(database, "DB_WRITE_DURABILITY", "enqueue")
+
+        async def check():
+            await database.save_quiz_attempt(U, "q", 2, 5, {})
+            return await database.get_quiz_best(U, "q")
+
+        assert run(_with_pool(check))["score"] == 2
+
+    def test_failing_write_does_not_sink_batch(self, db_path):
+        async def check():
+            bad = database._submit([("INSERT INTO nope VALUES (?)", (1,))])
+            good = database.mark_lesson_complete(U, "m::a", "m", "a")
+            results = await asyncio.gather(bad, good, return_exceptions=True)
+            return results, await database.get_completed_counts(U)
+
+        (bad, good), counts = run(_with_pool(check))
+        assert isinstance(bad, Exception)
+        assert good is None
+        assert counts == {"m": 1}
+
+    def _crash_once(self, monkeypatch):
+        real = database._commit_batch
+        crashed = []
+
+        async def crashing(batch):
+            if not crashed:
+                crashed.append(len(batch))
+                raise RuntimeError("writer died")
+            return await real(batch)
+
+        monkeypatch.setattr(database, "_commit_batch", crashing)
+        return crashed
+
+    def test_crashed_writer_fails_waiters_and_restarts(self, db_path, monkeypatch):
+        self._crash_once(monkeypatch)
+
+        async def check():
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(database.mark_lesson_complete(U, "m::a", "m", "a"), 5)
+            await asyncio.wait_for(database.mark_lesson_complete(U, "m::b", "m", "b"), 5)
+            return await database.get_completed_counts(U)
+
+        assert run(_with_pool(check)) == {"m": 1}
+
+    def test_lost_enqueued_write_invalidates_cache(self, db_path, monkeypatch):
+        monkeypatch.setattr(database, "DB_WRITE_DURABILITY", "enqueue")
+        crashed = self._crash_once(monkeypatch)
+
+        async def check():
+            await database.load_progress_cache()
+            assert await database.get_completed_counts(U) == {}  # learner now cached
+            await database.mark_lesson_complete(U, "m::a", "m", "a")
+            version = database.progress_version(U)
+            assert await database.get_completed_counts(U) == {"m": 1}  # optimistic
+            await database.flush_writes()
+            assert database.progress_version(U) > version
+            return await database.get_completed_counts(U)
+
+        assert run(_with_pool(check)) == {}
+        assert crashed
@@ -0,0 +1,429 @@
+"""
+OpenClaw Academy — route tests via the ASGI test client (no browser or server
+needed; FastAPI's TestClient requires httpx).
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import compression, content, database, main
+from app.main import app
+
+COURSE_DIR = Path(__file__).parent.parent / "course"
+LESSON_ID = "module-01-overview::what-is-openclaw"
+LESSON_URL = "/module/module-01-overview/lesson/what-is-openclaw"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(content, "COURSE_DIR", COURSE_DIR)
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "progress.db"))
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def uncached_client(monkeypatch, tmp_path):
+    """Client that reads progress from SQLite on every request."""
+    monkeypatch.setattr(database, "PROGRESS_CACHE", False)
+    monkeypatch.setattr(content, "COURSE_DIR", COURSE_DIR)
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "progress.db"))
+    with TestClient(app) as c:
+        yield c
+
+
+@contextmanager
+def count_queries(monkeypatch):
+    """Count database round trips (each helper uses one _read/_write block)."""
+    calls = []
+    real_read, real_write = database._read, database._write
+
+    def read():
+        calls.append("read")
+        return real_read()
+
+    def write():
+        calls.append("write")
+        return real_write()
+
+    monkeypatch.setattr(database, "_read", read)
+    monkeypatch.setattr(database, "_write", write)
+    try:
+        yield calls
+    finally:
+        monkeypatch.setattr(database, "_read", real_read)
+        monkeypatch.setattr(database, "_write", real_write)
+
+
+def _complete(client, lesson_id=LESSON_ID):
+    module_id, slug = lesson_id.split("::")
+    return client.post("/progress/toggle", data={
+        "lesson_id": lesson_id, "module_id": module_id,
+        "lesson_slug": slug, "currently_completed": 0,
+    })
+
+
+# ===========================================================================
+# Query counts
+# ===========================================================================
+
+class TestQueryCounts:
+
+    @pytest.mark.parametrize("path,expected", [
+        ("/", ["read"]),
+        ("/module/module-01-overview", ["read", "read"]),
+        ("/module/module-01-overview/lesson/what-is-openclaw", ["read", "read"]),
+        ("/module/module-01-overview/quiz", ["read", "read"]),
+        ("/api/progress", ["read"]),
+    ])
+    def test_progress_loaded_once_per_request(self, uncached_client, monkeypatch, path, expected):
+        _complete(uncached_client)
+        with count_queries(monkeypatch) as calls:
+            assert uncached_client.get(path).status_code == 200
+        assert calls == expected
+
+    def test_quiz_submit(self, uncached_client, monkeypatch):
+        with count_queries(monkeypatch) as calls:
+            assert uncached_client.post("/module/module-01-overview/quiz", data={"q1": "b"}).status_code == 200
+        assert calls == ["write", "read", "read"]
+
+    @pytest.mark.parametrize("path,expected", [
+        ("/", []),
+        ("/module/module-01-overview", []),
+        ("/module/module-01-overview/lesson/what-is-openclaw", []),
+        ("/module/module-01-overview/quiz", ["read"]),  # best quiz score
+        ("/api/progress", []),
+    ])
+    def test_progress_served_from_cache(self, client, monkeypatch, path, expected):
+        _complete(client)
+        client.get("/api/progress")  # first visit loads the learner's progress
+        with count_queries(monkeypatch) as calls:
+            assert client.get(path).status_code == 200
+        assert calls == expected
+
+
+# ===========================================================================
+# Progress rendering
+# ===========================================================================
+
+class TestProgressRendering:
+
+    def test_completion_shows_everywhere(self, client):
+        _complete(client)
+        lesson = client.get("/module/module-01-overview/lesson/what-is-openclaw").text
+        assert "✅ Completed" in lesson
+        assert "1/3" in lesson  # sidebar badge
+        assert "1/3 lessons complete" in client.get("/module/module-01-overview").text
+
+        api = client.get("/api/progress").json()
+        assert api["modules"][0]["done"] == 1
+        assert api["raw"][LESSON_ID]["completed"] == 1
+
+    def test_unknown_lessons_are_rejected(self, client):
+        for slug in ("made-up", "also-made-up"):
+            assert _complete(client, f"module-01-overview::{slug}").status_code == 404
+        assert client.get("/api/progress").json()["modules"][0]["done"] == 0
+
+    @pytest.mark.parametrize("cached", [True, False])
+    def test_stale_rows_do_not_count(self, client, monkeypatch, cached):
+        import asyncio
+        asyncio.run(database.mark_lesson_complete(
+            database.DEFAULT_LEARNER, "module-01-overview::renamed", "module-01-overview", "renamed",
+        ))
+        if not cached:
+            database.drop_progress_cache()
+        assert "0/3 lessons complete" in client.get("/module/module-01-overview").text
+        assert client.get("/api/progress").json()["modules"][0]["done"] == 0
+
+
+# ===========================================================================
+# Learners
+# ===========================================================================
+
+class TestLearners:
+
+    @pytest.fixture
+    def multi_client(self, client, monkeypatch):
+        from app import main
+        monkeypatch.setattr(main, "LEARNER_MODE", "header")
+        return client
+
+    def test_progress_is_per_learner(self, multi_client):
+        multi_client.headers["X-Learner-Id"] = "alice"
+        _complete(multi_client)
+        assert multi_client.get("/api/progress").json()["modules"][0]["done"] == 1
+
+        multi_client.headers["X-Learner-Id"] = "bob"
+        assert multi_client.get("/api/progress").json()["modules"][0]["done"] == 0
+
+    def test_anonymous_learner_gets_cookie(self, multi_client):
+        first = multi_client.get("/")
+        learner = first.cookies.get("ocademy_learner")
+        assert learner
+        _complete(multi_client)  # the client sends the cookie back
+        assert multi_client.get("/").cookies.get("ocademy_learner") is None
+        assert database.progress_version(learner) > 0
+
+    def test_no_cookie_on_static_files(self, multi_client):
+        for path in ("/static/css/style.css", "/api/search?q=gateway"):
+            assert "set-cookie" not in multi_client.get(path).headers, path
+        assert multi_client.get("/").cookies.get("ocademy_learner")
+
+
+# ===========================================================================
+# Sidebar fragment cache
+# ===========================================================================
+
+class TestSidebar:
+
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self):
+        main._sidebar_cache.clear()
+        yield
+        main._sidebar_cache.clear()
+
+    def test_reused_across_pages_of_a_module(self, client, monkeypatch):
+        client.get("/module/module-01-overview")
+        calls = []
+        real = main.load_modules
+        monkeypatch.setattr(main, "load_modules", lambda: calls.append(1) or real())
+        lesson = client.get(LESSON_URL).text
+        assert calls == []
+        assert '<div class="sidebar-module active">' in lesson
+
+    def test_keyed_on_progress_and_active_module(self, client):
+        client.get("/module/module-01-overview")
+        client.get("/module/module-02-gateway")
+        assert len(main._sidebar_cache) == 2
+
+        _complete(client)
+        assert "1/3" in client.get("/module/module-01-overview").text
+        assert len(main._sidebar_cache) == 3
+
+    def test_learners_do_not_share_sidebars(self, client, monkeypatch):
+        monkeypatch.setattr(main, "LEARNER_MODE", "header")
+        client.headers["X-Learner-Id"] = "alice"
+        _complete(client)
+        assert "1/3" in client.get(LESSON_URL).text
+        client.headers["X-Learner-Id"] = "bob"
+        assert "0/3" in client.get(LESSON_URL).text
+
+
+# ===========================================================================
+# Conditional requests
+# ===========================================================================
+
+class TestConditionalRequests:
+
+    @pytest.mark.parametrize("path", [
+        "/",
+        "/module/module-01-overview",
+        LESSON_URL,
+        "/module/module-01-overview/quiz",
+    ])
+    def test_revisit_is_304_without_rendering(self, client, monkeypatch, path):
+        first = client.get(path)
+        etag = first.headers["etag"]
+
+        def boom(*args, **kwargs):
+            raise AssertionError("template rendered for a 304")
+
+        monkeypatch.setattr(main.templates, "TemplateResponse", boom)
+        with count_queries(monkeypatch) as calls:
+            again = client.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+        assert calls == []
+
+    def test_progress_change_invalidates(self, client):
+        etag = client.get(LESSON_URL).headers["etag"]
+        _complete(client)
+        again = client.get(LESSON_URL, headers={"If-None-Match": etag})
+        assert again.status_code == 200
+        assert again.headers["etag"] != etag
+        assert "✅ Completed" in again.text
+
+    def test_quiz_attempt_invalidates_quiz_page(self, client):
+        url = "/module/module-01-overview/quiz"
+        etag = client.get(url).headers["etag"]
+        client.post(url, data={"q1": "b"})
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_lesson_edit_invalidates(self, client, tmp_path, monkeypatch):
+        import shutil
+        course = tmp_path / "course"
+        shutil.copytree(COURSE_DIR / "module-01-overview", course / "module-01-overview")
+        monkeypatch.setattr(content, "COURSE_DIR", course)
+        etag = client.get(LESSON_URL).headers["etag"]
+
+        lesson = next((course / "module-01-overview").glob("*what-is-openclaw.md"))
+        lesson.write_text("# Rewritten\n")
+        st = lesson.stat()
+        os.utime(lesson, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        again = client.get(LESSON_URL, headers={"If-None-Match": etag})
+        assert again.status_code == 200
+        assert "Rewritten" in again.text
+
+    def test_personal_pages_validate_on_etag_only(self, client):
+        # A toggle in the same second as the last response must not be hidden
+        # behind If-Modified-Since's one-second granularity
+        assert "last-modified" not in client.get(LESSON_URL).headers
+        since = "Fri, 31 Dec 9999 23:59:59 GMT"
+        _complete(client)
+        assert client.get(LESSON_URL, headers={"If-Modified-Since": since}).status_code == 200
+
+    def test_no_validators_without_progress_cache(self, uncached_client):
+        assert "etag" not in uncached_client.get(LESSON_URL).headers
+
+
+# ===========================================================================
+# Shared pages
+# ===========================================================================
+
+class TestSharedPages:
+
+    PAGES = [
+        "/module/module-01-overview",
+        LESSON_URL,
+        "/module/module-01-overview/quiz",
+    ]
+
+    @pytest.fixture
+    def shared_client(self, client, monkeypatch):
+        monkeypatch.setattr(main, "SHARED_PAGES", True)
+        monkeypatch.setattr(main, "LEARNER_MODE", "header")
+        main._sidebar_cache.clear()
+        yield client
+        main._sidebar_cache.clear()
+
+    def test_if_modified_since(self, shared_client):
+        last_modified = shared_client.get(LESSON_URL).headers["last-modified"]
+        assert shared_client.get(LESSON_URL, headers={"If-Modified-Since": last_modified}).status_code == 304
+        assert shared_client.get(LESSON_URL, headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+
+    @pytest.mark.parametrize("path", PAGES)
+    def test_same_page_for_every_learner(self, shared_client, path):
+        shared_client.headers["X-Learner-Id"] = "alice"
+        _complete(shared_client)
+        shared_client.post("/module/module-01-overview/quiz", data={"q1": "b"})
+        alice = shared_client.get(path)
+        shared_client.headers["X-Learner-Id"] = "bob"
+        bob = shared_client.get(path)
+
+        assert alice.text == bob.text
+        assert alice.headers["etag"] == bob.headers["etag"]
+        assert alice.headers["cache-control"].startswith("public, max-age=")
+        assert f'hx-get="/progress{path}"' in alice.text
+        assert "✅" not in alice.text and "Best score" not in alice.text
+
+    def test_no_cookie_on_shared_pages(self, shared_client, monkeypatch):
+        monkeypatch.setattr(main, "LEARNER_MODE", "cookie")
+        assert "set-cookie" not in shared_client.get(LESSON_URL).headers
+        assert shared_client.get("/progress" + LESSON_URL).cookies.get("ocademy_learner")
+
+    def test_fragments_fill_in_progress(self, shared_client):
+        shared_client.headers["X-Learner-Id"] = "alice"
+        _complete(shared_client)
+        shared_client.post("/module/module-01-overview/quiz", data={"q1": "b"})
+
+        lesson = shared_client.get("/progress" + LESSON_URL)
+        assert lesson.headers["cache-control"] == "private, no-cache"
+        assert '<div id="progress-btn-wrap" hx-swap-oob="true">' in lesson.text
+        assert "✅ Completed" in lesson.text
+        assert '<div id="sidebar-modules" hx-swap-oob="innerHTML">' in lesson.text
+        assert "1/3" in lesson.text  # sidebar badge
+        assert "1/3 lessons complete" in shared_client.get("/progress/module/module-01-overview").text
+        assert "Best score" in shared_client.get("/progress/module/module-01-overview/quiz").text
+        assert shared_client.get("/progress/module/module-01-overview/lesson/nope").status_code == 404
+
+    def test_fragment_revalidates_until_progress_changes(self, shared_client):
+        url = "/progress" + LESSON_URL
+        etag = shared_client.get(url).headers["etag"]
+        assert shared_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        _complete(shared_client)
+        assert shared_client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_toggle_keeps_its_target(self, client):
+        # The swapped-in button must still carry the id the next toggle targets
+        assert '<div id="progress-btn-wrap">' in _complete(client).text
+
+
+# ===========================================================================
+# Compression
+# ===========================================================================
+
+class TestCompression:
+
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self):
+        compression.clear_compression_cache()
+        yield
+        compression.clear_compression_cache()
+
+    def test_pages_and_static_files_are_gzipped(self, client):
+        for path in (LESSON_URL, "/static/css/style.css", "/api/progress"):
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip", path
+            assert "Accept-Encoding" in response.headers["vary"]
+        assert "What is OpenClaw" in client.get(LESSON_URL, headers={"Accept-Encoding": "gzip"}).text
+
+    def test_identity_when_not_accepted(self, client):
+        response = client.get(LESSON_URL, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"].startswith('"')
+
+    def test_validated_pages_reuse_compressed_body(self, client):
+        first = client.get(LESSON_URL, headers={"Accept-Encoding": "gzip"})
+        second = client.get(LESSON_URL, headers={"Accept-Encoding": "gzip"})
+        assert first.content == second.content
+        assert compression.compression_stats()["hits"] == 1
+
+    def test_compressed_etag_is_weak_and_revalidates(self, client):
+        etag = client.get(LESSON_URL, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        assert etag.startswith('W/"')
+        again = client.get(LESSON_URL, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+
+    def test_large_bodies_are_streamed_not_cached(self, client, monkeypatch):
+        monkeypatch.setattr(compression, "COMPRESS_MAX_BYTES", 1000)
+        response = client.get("/static/css/style.css", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.content == (Path(main.BASE_DIR) / "static" / "css" / "style.css").read_bytes()
+        stats = compression.compression_stats()
+        assert (stats["streamed"], stats["size"]) == (1, 0)
+
+    def test_cache_is_bounded_by_bytes(self, client, monkeypatch):
+        first = client.get(LESSON_URL, headers={"Accept-Encoding": "gzip"})
+        monkeypatch.setattr(compression, "COMPRESS_CACHE_BYTES", int(first.headers["content-length"]) + 100)
+        client.get("/module/module-01-overview", headers={"Accept-Encoding": "gzip"})
+        stats = compression.compression_stats()
+        assert stats["size"] == 1
+        assert stats["bytes"] <= compression.COMPRESS_CACHE_BYTES
+
+    def test_brotli_preferred(self, client):
+        pytest.importorskip("brotli")
+        response = client.get(LESSON_URL, headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+
+
+# ===========================================================================
+# Search
+# ===========================================================================
+
+class TestSearch:
+
+    def test_search_page(self, client):
+        html = client.get("/search", params={"q": "gateway daemon"}).text
+        assert "/module/module-02-gateway/lesson/gateway-daemon" in html
+        assert "<mark>" in html
+
+    def test_search_api(self, client):
+        results = client.get("/api/search", params={"q": "gateway", "limit": 3}).json()["results"]
+        assert len(results) == 3
+        assert all(r["url"].startswith("/module/") for r in results)
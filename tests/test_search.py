@@ -0,0 +1,102 @@
+"""
+OpenClaw Academy — lesson search unit tests (no browser or server needed).
+"""
+
+import os
+
+import pytest
+
+from app import content, search
+
+
+def _write_module(root, name, order, lessons):
+    module_dir = root / name
+    module_dir.mkdir(parents=True, exist_ok=True)
+    lines = [f"id: {name}", f"title: \"{name.title()}\"", f"order: {order}", "lessons:"]
+    for i, (slug, body) in enumerate(lessons.items(), 1):
+        lines += [f"  - slug: {slug}", f"    title: \"{slug.title()}\"", f"    file: {i:02d}-{slug}.md"]
+        (module_dir / f"{i:02d}-{slug}.md").write_text(body)
+    (module_dir / "meta.yaml").write_text("\n".join(lines) + "\n")
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def course(tmp_path, monkeypatch):
+    root = tmp_path / "course"
+    _write_module(root, "module-a", 1, {
+        "routing": "# Routing\n\nThe gateway routes every inbound message to an agent.\n",
+        "sessions": "# Sessions\n\nSessions persist between runs. `<b>` tags are text here.\n",
+    })
+    _write_module(root, "module-b", 2, {
+        "gateway": "# Gateway\n\nStarting the daemon.\n",
+    })
+    monkeypatch.setattr(content, "COURSE_DIR", root)
+    content.reload_catalog()
+    search.close()
+    yield root
+    search.close()
+
+
+class TestSearch:
+
+    def test_ranked_results_with_highlights(self, course):
+        results = search.search("gateway")
+        assert [r["lesson_id"] for r in results] == ["module-b::gateway", "module-a::routing"]
+        assert results[0]["title_html"] == "<mark>Gateway</mark>"
+        assert "The <mark>gateway</mark> routes" in results[1]["snippet_html"]
+        assert results[1]["url"] == "/module/module-a/lesson/routing"
+
+    def test_last_term_is_a_prefix(self, course):
+        assert [r["lesson_slug"] for r in search.search("persist betw")] == ["sessions"]
+
+    def test_query_syntax_and_markup_are_harmless(self, course):
+        assert search.search('"') == []
+        assert search.search("AND OR (") == []
+        html = search.search("tags")[0]["snippet_html"]
+        assert "&lt;b&gt;" in html and "<b>" not in html
+
+    def test_only_changed_lessons_are_reindexed(self, course):
+        assert search.sync() == {"indexed": 3, "removed": 0}
+        assert search.sync() == {"indexed": 0, "removed": 0}
+
+        lesson = course / "module-a" / "02-sessions.md"
+        lesson.write_text("# Sessions\n\nNow about compaction.\n")
+        _bump_mtime(lesson)
+        assert search.sync() == {"indexed": 1, "removed": 0}
+        assert [r["lesson_slug"] for r in search.search("compaction")] == ["sessions"]
+        assert search.search("persist") == []
+
+    def test_removed_lessons_leave_the_index(self, course):
+        search.sync()
+        (course / "module-b" / "meta.yaml").unlink()
+        _bump_mtime(course)
+        assert search.sync() == {"indexed": 0, "removed": 1}
+        assert [r["module_id"] for r in search.search("gateway")] == ["module-a"]
+
+
+class TestStaticIndex:
+
+    def test_postings_and_shards(self, course):
+        files = search.build_static_index()
+        manifest = files["index.json"]
+        urls = [d[0] for d in manifest["docs"]]
+        assert urls[0] == "/module/module-a/lesson/routing"
+        assert sorted(n for n in files if n.startswith("terms-")) == [f"terms-{k}.json" for k in manifest["shards"]]
+
+        routing = urls.index("/module/module-a/lesson/routing")
+        postings = {p[0]: p for p in files["terms-ga.json"]["gateway"]}
+        doc, tf, *positions = postings[routing]
+        words = files[f"text-{routing}.json"].lower().split()
+        assert tf == 1
+        assert words[positions[0]] == "gateway"
+
+    def test_non_ascii_heads_share_a_shard(self, course):
+        lesson = course / "module-b" / "01-gateway.md"
+        lesson.write_text("# Gateway\n\nÜber naïve café.\n")
+        files = search.build_static_index()
+        assert "über" in files["terms-_.json"]
+        assert "naïve" in files["terms-na.json"]  # sharded on the ASCII head
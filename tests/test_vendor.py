@@ -0,0 +1,89 @@
+"""
+OpenClaw Academy — vendor store unit tests (no browser, server or network needed).
+"""
+
+import hashlib
+import json
+
+import pytest
+
+from app import vendor
+
+JS = b"console.log('highlight');\n"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    lock = {
+        "highlight-css": {"file": "github-dark.min.css", "url": "https://cdn.example/github-dark.min.css", "sha256": None},
+        "highlight": {"file": "highlight.min.js", "url": "https://cdn.example/highlight.min.js",
+                      "sha256": hashlib.sha256(JS).hexdigest()},
+        "highlight-yaml": {"file": "yaml.min.js", "url": "https://cdn.example/yaml.min.js", "sha256": None,
+                           "languages": ["yaml", "yml"]},
+        "mermaid": {"file": "mermaid.min.js", "url": "https://cdn.example/mermaid.min.js", "sha256": None},
+        "htmx": {"file": "htmx.min.js", "url": "https://cdn.example/htmx.min.js", "sha256": None},
+    }
+    lock_file = tmp_path / "vendor.lock.json"
+    lock_file.write_text(json.dumps(lock))
+    vendor_dir = tmp_path / "vendor"
+    vendor_dir.mkdir()
+    monkeypatch.setattr(vendor, "LOCK_FILE", lock_file)
+    monkeypatch.setattr(vendor, "VENDOR_DIR", vendor_dir)
+    monkeypatch.setattr(vendor, "VENDOR_SUBSET", True)
+    vendor.reset()
+    yield vendor_dir
+    vendor.reset()
+
+
+class TestStore:
+    def test_missing_copy_links_cdn_with_integrity(self, store):
+        assert vendor.check("highlight") == "missing"
+        tag = vendor.tag("highlight")
+        assert 'src="https://cdn.example/highlight.min.js"' in tag
+        assert 'integrity="sha256-' in tag
+        assert 'crossorigin="anonymous"' in tag
+
+    def test_verified_copy_is_served_locally(self, store):
+        (store / "highlight.min.js").write_bytes(JS)
+        assert vendor.check("highlight") == "ok"
+        assert vendor.tag("highlight") == '<script src="/static/vendor/highlight.min.js"></script>'
+
+    def test_tampered_copy_is_never_served(self, store):
+        (store / "highlight.min.js").write_bytes(b"alert('pwned');\n")
+        assert vendor.check("highlight") == "mismatch"
+        assert vendor.asset_url("highlight") == "https://cdn.example/highlight.min.js"
+
+    def test_unpinned_copy_links_cdn_without_integrity(self, store):
+        (store / "htmx.min.js").write_bytes(b"htmx")
+        assert vendor.check("htmx") == "unpinned"
+        assert vendor.tag("htmx") == '<script src="https://cdn.example/htmx.min.js"></script>'
+
+    def test_stylesheet_tag(self, store):
+        assert vendor.tag("highlight-css").startswith('<link rel="stylesheet"')
+
+
+class TestPageAssets:
+    def test_page_without_lesson_body_loads_only_htmx(self, store):
+        assert vendor.page_assets() == ["htmx"]
+        assert vendor.page_assets("<p>No code here.</p>") == ["htmx"]
+
+    def test_client_highlighting_loads_only_used_languages(self, store):
+        html = '<pre><code class="language-yaml">a: 1</code></pre>'
+        assert vendor.page_assets(html) == ["highlight-css", "highlight", "highlight-yaml", "htmx"]
+        html = '<pre><code class="language-python">x = 1</code></pre>'
+        assert vendor.page_assets(html) == ["highlight-css", "highlight", "htmx"]
+
+    def test_server_highlighted_page_needs_only_the_theme(self, store):
+        html = '<pre><code class="hljs language-yaml">a: 1</code></pre>'
+        assert vendor.page_assets(html, highlighted=True) == ["highlight-css", "htmx"]
+
+    def test_mermaid_only_with_a_diagram(self, store):
+        html = '<div class="mermaid">graph TD; A-->B</div>'
+        assert vendor.page_assets(html) == ["mermaid", "htmx"]
+
+    def test_subsetting_disabled_loads_everything(self, store, monkeypatch):
+        monkeypatch.setattr(vendor, "VENDOR_SUBSET", False)
+        assert vendor.page_assets() == ["mermaid", "htmx"]
+        assert vendor.page_assets("<p>x</p>") == [
+            "highlight-css", "highlight", "highlight-yaml", "mermaid", "htmx",
+        ]